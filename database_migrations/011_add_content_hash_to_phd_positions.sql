@@ -0,0 +1,17 @@
+-- ============================================
+-- 为PhD职位表添加内容指纹字段
+-- 迁移编号: 011
+-- 创建日期: 2026-10-18
+-- 说明: 为phd_positions表添加content_hash字段，同步脚本据此跳过内容未变化的upsert，
+--       只批量刷新last_scraped_at
+-- ============================================
+
+-- 添加content_hash字段（规范化岗位内容的SHA-256，不含last_scraped_at）
+ALTER TABLE phd_positions
+ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- 添加字段注释
+COMMENT ON COLUMN phd_positions.content_hash IS '岗位内容指纹（SHA-256），由academictransfer_phd_sync.py写入，用于跳过未变化记录';
+
+-- 完成提示
+SELECT 'Content hash column added to phd_positions table successfully!' as message;
@@ -14,14 +14,24 @@ are included for traceability/debugging.
 from __future__ import annotations
 
 import argparse
+import base64
+import hashlib
 import json
+import math
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
 
 import requests
 
+from http_session import ErrorBudget, ErrorBudgetExhausted, create_session
+from rate_limiter import TokenBucket
+from record_io import NdjsonWriter, collect_written_keys
+
 BASE_DATA_URL = "https://api.academictransfer.com"
 LISTING_PAGE_TEMPLATE = (
     "https://www.academictransfer.com/{locale}/jobs?function_types=1"
@@ -31,6 +41,13 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0",
 }
 
+DEFAULT_TOKEN_CACHE = Path("tmp/academictransfer_token.json")
+DEFAULT_TOKEN_TTL = 6 * 60 * 60  # seconds; used when the token carries no `exp`
+TOKEN_EXPIRY_MARGIN = 60  # refresh this many seconds before the JWT `exp`
+
+# Listing fields that change whenever a vacancy is edited, in order of preference.
+LISTING_VERSION_FIELDS = ("modified", "modified_at", "updated_at", "last_modified", "etag")
+
 
 class TokenExtractionError(RuntimeError):
     """Raised when we cannot locate the public API token."""
@@ -102,28 +119,200 @@ def build_api_headers(token: str) -> Dict[str, str]:
     return headers
 
 
+def decode_jwt_expiry(token: str) -> Optional[float]:
+    """Return the `exp` claim of a JWT as a unix timestamp, or None for opaque tokens."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    segment = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(segment.encode("ascii")))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    exp = claims.get("exp") if isinstance(claims, dict) else None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+class PublicTokenProvider:
+    """
+    Hand out the public API token, resolving it from the listing page only when
+    the on-disk cache is missing, expired or the API rejected the cached token.
+    """
+
+    def __init__(
+        self,
+        locale: str,
+        session: Optional[requests.Session] = None,
+        cache_path: Optional[Path] = DEFAULT_TOKEN_CACHE,
+        ttl: float = DEFAULT_TOKEN_TTL,
+    ) -> None:
+        self.locale = locale
+        self.session = session or requests.Session()
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._load_cache()
+
+    def _expiry_for(self, token: str, fetched_at: float) -> float:
+        expires_at = fetched_at + self.ttl
+        jwt_exp = decode_jwt_expiry(token)
+        if jwt_exp is not None:
+            expires_at = min(expires_at, jwt_exp - TOKEN_EXPIRY_MARGIN)
+        return expires_at
+
+    def _load_cache(self) -> None:
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            data = json.loads(self.cache_path.read_text("utf-8"))
+            token = data["token"]
+            fetched_at = float(data["fetched_at"])
+        except (ValueError, KeyError, TypeError):
+            return
+        if data.get("locale") != self.locale or not isinstance(token, str):
+            return
+        self._token = token
+        self._expires_at = self._expiry_for(token, fetched_at)
+
+    def _save_cache(self, token: str, fetched_at: float) -> None:
+        if not self.cache_path:
+            return
+        payload = {"locale": self.locale, "token": token, "fetched_at": fetched_at}
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_path.write_text(json.dumps(payload), "utf-8")
+
+    def _resolve(self) -> str:
+        token = resolve_public_token(self.locale, session=self.session)
+        fetched_at = time.time()
+        self._token = token
+        self._expires_at = self._expiry_for(token, fetched_at)
+        self._save_cache(token, fetched_at)
+        return token
+
+    def token(self) -> str:
+        with self._lock:
+            if self._token and time.time() < self._expires_at:
+                return self._token
+            return self._resolve()
+
+    def refresh(self, stale: Optional[str] = None) -> str:
+        """
+        Force a new token after the API rejected `stale`. If another thread has
+        already replaced it, the newer token is returned without a second fetch.
+        """
+        with self._lock:
+            if self._token and stale is not None and self._token != stale:
+                return self._token
+            print("Refreshing AcademicTransfer public token", file=sys.stderr)
+            return self._resolve()
+
+    def headers(self) -> Dict[str, str]:
+        return build_api_headers(self.token())
+
+
+def get_api_json(
+    sess: requests.Session,
+    url: str,
+    headers: Dict[str, str],
+    params: Optional[Dict[str, Any]] = None,
+    token_provider: Optional[PublicTokenProvider] = None,
+) -> Dict[str, Any]:
+    """GET an API resource, retrying once with a fresh token on 401/403."""
+    token = token_provider.token() if token_provider else None
+    request_headers = build_api_headers(token) if token else headers
+    response = sess.get(url, headers=request_headers, params=params, timeout=30)
+    if token_provider and response.status_code in (401, 403):
+        token = token_provider.refresh(stale=token)
+        response = sess.get(
+            url, headers=build_api_headers(token), params=params, timeout=30
+        )
+    response.raise_for_status()
+    return response.json()
+
+
+def plan_page_urls(next_url: str, count: int, page_len: int) -> Optional[List[str]]:
+    """
+    Derive the URLs of all remaining pages from the first `next` link.
+
+    Works for limit/offset and page-number pagination. Returns None for opaque
+    (cursor) links, where the only way forward is to follow `next` one by one.
+    """
+    parts = urlsplit(next_url)
+    query = parse_qs(parts.query, keep_blank_values=True)
+
+    def with_query(**overrides: int) -> str:
+        updated = dict(query)
+        for key, value in overrides.items():
+            updated[key] = [str(value)]
+        return urlunsplit(parts._replace(query=urlencode(updated, doseq=True)))
+
+    try:
+        if "offset" in query:
+            offset = int(query["offset"][0])
+            limit = int((query.get("limit") or query.get("page_size") or [page_len])[0])
+            if limit <= 0:
+                return None
+            return [with_query(offset=value) for value in range(offset, count, limit)]
+        if "page" in query:
+            page = int(query["page"][0])
+            size = int((query.get("page_size") or [page_len])[0])
+            if size <= 0:
+                return None
+            last_page = math.ceil(count / size)
+            return [with_query(page=value) for value in range(page, last_page + 1)]
+    except ValueError:
+        return None
+    return None
+
+
 def fetch_paginated_results(
     headers: Dict[str, str],
     params: Dict[str, Any],
     session: Optional[requests.Session] = None,
+    token_provider: Optional[PublicTokenProvider] = None,
+    concurrency: int = 1,
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Collect every listing page. With `concurrency` > 1 the remaining pages are
+    computed from the first payload's `count` and fetched in parallel; opaque
+    `next` links fall back to following the cursor page by page.
+    """
     sess = session or requests.Session()
-    url = f"{BASE_DATA_URL}/vacancies/"
-    all_items: List[Dict[str, Any]] = []
-    first_payload: Optional[Dict[str, Any]] = None
+    first_payload = get_api_json(
+        sess, f"{BASE_DATA_URL}/vacancies/", headers, params, token_provider
+    )
+    all_items: List[Dict[str, Any]] = list(first_payload.get("results", []))
+    url = first_payload.get("next")
+
+    count = first_payload.get("count")
+    page_urls = None
+    if url and concurrency > 1 and isinstance(count, int) and all_items:
+        page_urls = plan_page_urls(url, count, len(all_items))
+
+    if page_urls:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(page_urls))) as executor:
+            pages = list(
+                executor.map(
+                    lambda page_url: get_api_json(
+                        sess, page_url, headers, token_provider=token_provider
+                    ),
+                    page_urls,
+                )
+            )
+        for payload in pages:
+            all_items.extend(payload.get("results", []))
+        # New vacancies may have been published meanwhile; pick up any tail.
+        url = pages[-1].get("next")
 
     while url:
-        response = sess.get(url, headers=headers, params=params, timeout=30)
-        # Only include params on first request; `next` already contains query string.
-        params = {}
-        response.raise_for_status()
-        payload = response.json()
-        if first_payload is None:
-            first_payload = payload
+        # `next` already contains the query string, so params are not resent.
+        payload = get_api_json(sess, url, headers, token_provider=token_provider)
         all_items.extend(payload.get("results", []))
         url = payload.get("next")
 
-    return all_items, first_payload or {}
+    return all_items, first_payload
 
 
 def infer_supports_international(text_blocks: Iterable[str]) -> bool:
@@ -180,26 +369,139 @@ def transform_detail(detail: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def fetch_details(
+def listing_fingerprint(item: Dict[str, Any]) -> str:
+    """Return a value that changes whenever the listing entry of a vacancy changes."""
+    for key in LISTING_VERSION_FIELDS:
+        value = item.get(key)
+        if value:
+            return f"{key}:{value}"
+    canonical = json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_sync_state(path: Path) -> Dict[str, str]:
+    """Load the vacancy id -> listing fingerprint map written by the previous run."""
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text("utf-8"))
+    except json.JSONDecodeError:
+        print(f"Ignoring unreadable sync state: {path}", file=sys.stderr)
+        return {}
+    fingerprints = data.get("fingerprints") if isinstance(data, dict) else None
+    return fingerprints if isinstance(fingerprints, dict) else {}
+
+
+def save_sync_state(path: Path, fingerprints: Dict[str, str]) -> None:
+    payload = {
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "fingerprints": fingerprints,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), "utf-8")
+
+
+def record_vacancy_id(record: Dict[str, Any]) -> Optional[Any]:
+    """Vacancy id of a transformed record (the API id, not the external id)."""
+    return (record.get("raw") or {}).get("id")
+
+
+def load_previous_records(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Index the records of a previous output file by vacancy id."""
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text("utf-8"))
+    except json.JSONDecodeError:
+        print(f"Ignoring unreadable previous output: {path}", file=sys.stderr)
+        return {}
+    records: Dict[str, Dict[str, Any]] = {}
+    for record in data.get("items", []) if isinstance(data, dict) else []:
+        vacancy_id = record_vacancy_id(record)
+        if vacancy_id is not None:
+            records[str(vacancy_id)] = record
+    return records
+
+
+def plan_incremental_fetch(
+    listing: List[Dict[str, Any]],
+    state: Dict[str, str],
+    previous: Dict[str, Dict[str, Any]],
+) -> Tuple[List[int], Dict[str, str]]:
+    """
+    Split the listing into ids that need a detail request and ids whose previous
+    record can be reused. Returns (ids_to_fetch, current_fingerprints).
+    """
+    to_fetch: List[int] = []
+    fingerprints: Dict[str, str] = {}
+    for item in listing:
+        key = str(item["id"])
+        fingerprint = listing_fingerprint(item)
+        fingerprints[key] = fingerprint
+        if state.get(key) != fingerprint or key not in previous:
+            to_fetch.append(item["id"])
+    return to_fetch, fingerprints
+
+
+def iter_details(
     ids: Iterable[int],
     headers: Dict[str, str],
     delay: float = 0.4,
     session: Optional[requests.Session] = None,
-) -> List[Dict[str, Any]]:
+    workers: int = 1,
+    token_provider: Optional[PublicTokenProvider] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Fetch and transform vacancy details, yielding them in the order of `ids`
+    as soon as each one (and every one before it) is available.
+
+    `delay` is enforced as a global rate limit (1 / delay requests per second)
+    shared by all `workers`, so extra workers only overlap network latency and
+    never raise the request rate above the politeness budget. With a
+    `token_provider`, an expired token is refreshed transparently mid-run.
+    """
     sess = session or requests.Session()
-    records: List[Dict[str, Any]] = []
-    for vacancy_id in ids:
-        response = sess.get(
+    limiter = TokenBucket.from_delay(delay)
+
+    def fetch_one(vacancy_id: int) -> Dict[str, Any]:
+        if limiter:
+            limiter.acquire()
+        detail = get_api_json(
+            sess,
             f"{BASE_DATA_URL}/vacancies/{vacancy_id}/",
-            headers=headers,
-            timeout=30,
+            headers,
+            token_provider=token_provider,
         )
-        response.raise_for_status()
-        detail = response.json()
-        records.append(transform_detail(detail))
-        if delay:
-            time.sleep(delay)
-    return records
+        return transform_detail(detail)
+
+    if workers <= 1:
+        for vacancy_id in ids:
+            yield fetch_one(vacancy_id)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(fetch_one, ids)
+
+
+def fetch_details(
+    ids: Iterable[int],
+    headers: Dict[str, str],
+    delay: float = 0.4,
+    session: Optional[requests.Session] = None,
+    workers: int = 1,
+    token_provider: Optional[PublicTokenProvider] = None,
+) -> List[Dict[str, Any]]:
+    """Collect `iter_details` into a list (see there for the rate limiting)."""
+    return list(
+        iter_details(
+            ids,
+            headers,
+            delay=delay,
+            session=session,
+            workers=workers,
+            token_provider=token_provider,
+        )
+    )
 
 
 def main(argv: Optional[List[str]] = None) -> int:
@@ -211,12 +513,35 @@ def main(argv: Optional[List[str]] = None) -> int:
         default="en",
         help="Locale to use when extracting the public token (default: en)",
     )
+    parser.add_argument(
+        "--token-cache",
+        type=Path,
+        default=DEFAULT_TOKEN_CACHE,
+        help=f"Public token cache file (default: {DEFAULT_TOKEN_CACHE})",
+    )
+    parser.add_argument(
+        "--token-ttl",
+        type=float,
+        default=DEFAULT_TOKEN_TTL,
+        help="Max age (seconds) of a cached token without a JWT exp (default: 6h)",
+    )
+    parser.add_argument(
+        "--no-token-cache",
+        action="store_true",
+        help="Always resolve the token from the listing page",
+    )
     parser.add_argument(
         "--page-size",
         type=int,
         default=100,
         help="Number of vacancies per API page (default: 100)",
     )
+    parser.add_argument(
+        "--page-concurrency",
+        type=int,
+        default=4,
+        help="Listing pages fetched in parallel after the first one (default: 4)",
+    )
     parser.add_argument(
         "--education-level",
         type=int,
@@ -244,25 +569,93 @@ def main(argv: Optional[List[str]] = None) -> int:
         "--output",
         type=Path,
         default=Path("tmp/phd_positions_api.json"),
-        help="Output JSON file path",
+        help="Output file path (JSON document, or one record per line for ndjson)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "ndjson"],
+        default="json",
+        help=(
+            "json: write one document at the end (default). ndjson: append and "
+            "flush every record as it is fetched, resuming after the last "
+            "written vacancy on restart"
+        ),
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="With --format ndjson, start over instead of resuming the output file",
     )
     parser.add_argument(
         "--delay",
         type=float,
         default=0.4,
-        help="Delay (seconds) between detail requests to stay polite",
+        help=(
+            "Minimum interval (seconds) between detail requests to stay polite; "
+            "applied as a rate limit shared by all workers"
+        ),
     )
     parser.add_argument(
         "--no-delay",
         action="store_true",
         help="Disable delay between detail requests",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of concurrent detail requests (default: 4, 1 = serial)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=4,
+        help="Retries per request on 429/5xx/network errors (default: 4)",
+    )
+    parser.add_argument(
+        "--error-budget",
+        type=int,
+        default=100,
+        help="Total retries allowed per run before aborting (default: 100)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Only fetch details for vacancies that are new or changed since the "
+            "last run; reuse unchanged records from the existing output file"
+        ),
+    )
+    parser.add_argument(
+        "--state-file",
+        type=Path,
+        help="Sync state file for --incremental (default: <output>.state.json)",
+    )
 
     args = parser.parse_args(argv)
-    session = requests.Session()
-
-    token = resolve_public_token(args.locale, session=session)
-    headers = build_api_headers(token)
+    if args.format == "ndjson" and args.incremental:
+        parser.error("--incremental is only supported with --format json")
+    workers = max(args.workers, 1)
+    session = create_session(
+        pool_size=max(workers, args.page_concurrency),
+        max_retries=max(args.max_retries, 0),
+        error_budget=ErrorBudget(args.error_budget),
+    )
+    try:
+        return run_fetch(args, session, workers)
+    except ErrorBudgetExhausted as exc:
+        print(f"Aborting: {exc}", file=sys.stderr)
+        return 1
+
+
+def run_fetch(args: argparse.Namespace, session: requests.Session, workers: int) -> int:
+    token_provider = PublicTokenProvider(
+        args.locale,
+        session=session,
+        cache_path=None if args.no_token_cache else args.token_cache,
+        ttl=args.token_ttl,
+    )
+    headers = token_provider.headers()
 
     params: Dict[str, Any] = {"page_size": args.page_size}
     if args.education_level and args.education_level > 0:
@@ -288,7 +681,13 @@ def main(argv: Optional[List[str]] = None) -> int:
         else:
             params[key] = [existing, value]
 
-    listing, meta = fetch_paginated_results(headers, params, session=session)
+    listing, meta = fetch_paginated_results(
+        headers,
+        params,
+        session=session,
+        token_provider=token_provider,
+        concurrency=max(args.page_concurrency, 1),
+    )
     listing_meta = {
         "count": meta.get("count"),
         "next": meta.get("next"),
@@ -296,8 +695,64 @@ def main(argv: Optional[List[str]] = None) -> int:
     }
     vacancy_ids = [item["id"] for item in listing]
 
+    state_file = args.state_file or args.output.with_suffix(".state.json")
+    previous: Dict[str, Dict[str, Any]] = {}
+    fingerprints: Dict[str, str] = {}
+    ids_to_fetch = vacancy_ids
+    if args.incremental:
+        previous = load_previous_records(args.output)
+        ids_to_fetch, fingerprints = plan_incremental_fetch(
+            listing, load_sync_state(state_file), previous
+        )
+        print(
+            f"Incremental sync: {len(ids_to_fetch)} new/changed, "
+            f"{len(vacancy_ids) - len(ids_to_fetch)} unchanged",
+            file=sys.stderr,
+        )
+
     detail_delay = 0.0 if args.no_delay else max(args.delay, 0.0)
-    details = fetch_details(vacancy_ids, headers, delay=detail_delay, session=session)
+    if args.format == "ndjson":
+        written: set = set()
+        if not args.no_resume:
+            written = collect_written_keys(args.output, record_vacancy_id)
+        remaining = [vid for vid in vacancy_ids if str(vid) not in written]
+        if written:
+            print(
+                f"Resuming {args.output}: {len(written)} already written, "
+                f"{len(remaining)} remaining",
+                file=sys.stderr,
+            )
+        with NdjsonWriter(args.output, truncate=args.no_resume) as writer:
+            for record in iter_details(
+                remaining,
+                headers,
+                delay=detail_delay,
+                session=session,
+                workers=workers,
+                token_provider=token_provider,
+            ):
+                writer.write(record)
+        print(
+            f"Fetched {writer.count} vacancy details. Output written to {args.output}",
+            file=sys.stderr,
+        )
+        return 0
+
+    fetched = fetch_details(
+        ids_to_fetch,
+        headers,
+        delay=detail_delay,
+        session=session,
+        workers=workers,
+        token_provider=token_provider,
+    )
+    if args.incremental:
+        fetched_by_id = dict(zip((str(vid) for vid in ids_to_fetch), fetched))
+        details = [
+            fetched_by_id.get(str(vid)) or previous[str(vid)] for vid in vacancy_ids
+        ]
+    else:
+        details = fetched
 
     payload = {
         "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
@@ -308,9 +763,12 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     args.output.parent.mkdir(parents=True, exist_ok=True)
     args.output.write_text(json.dumps(payload, ensure_ascii=False, indent=2), "utf-8")
+    if args.incremental:
+        save_sync_state(state_file, fingerprints)
 
     print(
-        f"Fetched {len(details)} vacancies. Output written to {args.output}",
+        f"Fetched {len(fetched)} vacancy details ({len(details)} total). "
+        f"Output written to {args.output}",
         file=sys.stderr,
     )
     return 0
@@ -7,11 +7,11 @@ AcademicTransfer PhD Positions Sync
 1. 从 AcademicTransfer 抓取全球博士岗位（function_types=1）
 2. 解析岗位详情（描述、要求、申请流程、截止时间等）
 3. 可选生成中文摘要
-4. 将结果写入 Supabase `phd_positions` 表（默认 upsert）
+4. 将结果写入 Supabase `phd_positions` 表（默认 upsert，边抓取边分批写入）
 5. 输出 JSON 备份，支持 dry-run / CLI 参数
 
 依赖：
-- selenium
+- selenium（仅 --link-source browser 需要）
 - beautifulsoup4
 - requests
 - （可选）python-dotenv
@@ -31,32 +31,52 @@ python3 academictransfer_phd_sync.py \
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
+import multiprocessing
 import os
+import queue
 import re
+import signal
 import sys
+import threading
 import time
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 import requests
 from bs4 import BeautifulSoup, NavigableString, Tag
-from selenium import webdriver
-from selenium.common.exceptions import (
-    ElementClickInterceptedException,
-    ElementNotInteractableException,
-    TimeoutException,
-    WebDriverException,
-)
-from selenium.webdriver import Chrome
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+
+# selenium 仅在 --link-source browser 时需要；API 模式下可不安装浏览器依赖
+try:
+    from selenium import webdriver
+    from selenium.common.exceptions import (
+        ElementClickInterceptedException,
+        ElementNotInteractableException,
+        TimeoutException,
+        WebDriverException,
+    )
+    from selenium.webdriver import Chrome
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+except ImportError:  # pragma: no cover - 取决于运行环境
+    webdriver = None
+
+from academictransfer_api_fetch import PublicTokenProvider, fetch_paginated_results
+from http_cache import DEFAULT_MAX_BYTES, HttpCache
+from html_parsers import DEFAULT_PARSER, PARSER_BACKENDS, check_parser, make_soup
+from http_session import ErrorBudget, ErrorBudgetExhausted, create_session
+from rate_limiter import TokenBucket
+from resource_blocking import BLOCK_PROFILES, DEFAULT_BLOCK_PROFILE, configure_options, enable_blocking
+from translation_memory import DEFAULT_DB_PATH as DEFAULT_TRANSLATION_DB
+from translation_memory import DEFAULT_MAX_CHARS, TranslationMemory, Translator
 
 # 尝试加载 .env（如未安装 python-dotenv 则忽略）
 try:
@@ -69,8 +89,12 @@ except Exception:  # pragma: no cover - 非核心逻辑
 
 LIST_URL = "https://www.academictransfer.com/en/jobs?function_types=1"
 JOB_URL_PATTERN = re.compile(r"https://www\.academictransfer\.com/en/jobs/(\d+)/(.*?)/?")
-TRANSLATE_ENDPOINT = "https://translate.googleapis.com/translate_a/single"
+JOB_PATH_PATTERN = re.compile(r"/jobs/(\d+)/([^/?#]*)")
+LINK_SOURCES = ("browser", "api")
 DEFAULT_SUPABASE_TABLE = "phd_positions"
+DEFAULT_HASH_INDEX = Path("tmp/phd_positions_content_hashes.json")
+# 不参与内容指纹的字段：每次抓取都会变化，但不代表岗位内容变化
+HASH_EXCLUDED_FIELDS = ("last_scraped_at", "content_hash")
 
 
 # ---------------------------
@@ -78,6 +102,13 @@ DEFAULT_SUPABASE_TABLE = "phd_positions"
 # ---------------------------
 
 
+def compute_content_hash(payload: Dict) -> str:
+    """对写入内容做规范化（排序键、去掉易变字段）后计算 SHA-256。"""
+    stable = {k: v for k, v in payload.items() if k not in HASH_EXCLUDED_FIELDS}
+    blob = json.dumps(stable, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
 @dataclass
 class JobRecord:
     """结构化后的岗位数据，用于写入 Supabase。"""
@@ -113,8 +144,8 @@ class JobRecord:
     raw_payload: Dict = field(default_factory=dict)
 
     def to_dict(self) -> Dict:
-        """转换为 Supabase 期望的字典格式。"""
-        return {
+        """转换为 Supabase 期望的字典格式（附带内容指纹 content_hash）。"""
+        data = {
             "source": "academictransfer",
             "source_id": self.source_id,
             "official_link": self.official_link,
@@ -144,229 +175,121 @@ class JobRecord:
             "last_scraped_at": self.last_scraped_at,
             "raw_payload": self.raw_payload or None,
         }
+        data["content_hash"] = compute_content_hash(data)
+        return data
 
 
-# ---------------------------
-# 同步主类
-# ---------------------------
-
-
-class AcademicTransferPhDSync:
-    def __init__(
-        self,
-        *,
-        max_pages: int = 8,
-        delay: float = 2.5,
-        detail_delay: float = 1.0,
-        max_jobs: Optional[int] = None,
-        headless: bool = True,
-        dry_run: bool = False,
-        enable_translation: bool = False,
-        output_path: Optional[Path] = None,
-        log_file: Optional[Path] = None,
-        supabase_url: Optional[str] = None,
-        supabase_key: Optional[str] = None,
-        supabase_table: str = DEFAULT_SUPABASE_TABLE,
-        supabase_batch_size: int = 50,
-        http_timeout: int = 30,
-    ) -> None:
-        self.max_pages = max_pages
-        self.delay = delay
-        self.detail_delay = detail_delay
-        self.max_jobs = max_jobs
-        self.headless = headless
-        self.dry_run = dry_run
-        self.enable_translation = enable_translation
-        self.output_path = output_path
-        self.supabase_url = (supabase_url or os.getenv("VITE_SUPABASE_URL", "")).rstrip("/")
-        self.supabase_key = (
-            supabase_key
-            or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-            or os.getenv("VITE_SUPABASE_SERVICE_ROLE_KEY")
-            or os.getenv("VITE_SUPABASE_ANON_KEY", "")
-        )
-        self.supabase_table = supabase_table
-        self.supabase_batch_size = supabase_batch_size
-        self.http_timeout = http_timeout
-
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": (
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0 Safari/537.36"
-                ),
-                "Accept-Language": "en-US,en;q=0.9",
-            }
-        )
-
-        self._driver: Optional[Chrome] = None
-
-        self._setup_logging(log_file)
-        logging.debug(
-            "AcademicTransferPhDSync initialized with params: %s",
-            {
-                "max_pages": max_pages,
-                "delay": delay,
-                "detail_delay": detail_delay,
-                "max_jobs": max_jobs,
-                "headless": headless,
-                "dry_run": dry_run,
-                "enable_translation": enable_translation,
-                "output_path": str(output_path) if output_path else None,
-                "supabase_url": self.supabase_url,
-                "supabase_table": supabase_table,
-            },
-        )
-
-    # ---------------------------
-    # Logging & Driver
-    # ---------------------------
-
-    def _setup_logging(self, log_file: Optional[Path]) -> None:
-        handlers = [logging.StreamHandler(sys.stdout)]
-        if log_file:
-            handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
-
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s [%(levelname)s] %(message)s",
-            handlers=handlers,
-        )
-
-    def _init_driver(self) -> Chrome:
-        options = Options()
-        if self.headless:
-            options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument(
-            "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) Chrome/118.0 Safari/537.36"
-        )
-        try:
-            driver = webdriver.Chrome(options=options)
-        except WebDriverException as exc:
-            logging.error("无法初始化 ChromeDriver，请确认已安装驱动。\n%s", exc)
-            raise
-
-        self._driver = driver
-        return driver
-
-    def _close_driver(self) -> None:
-        if self._driver:
-            try:
-                self._driver.quit()
-            except Exception:
-                pass
-            finally:
-                self._driver = None
-
-    # ---------------------------
-    # 爬虫流程
-    # ---------------------------
-
-    def collect_job_links(self) -> List[str]:
-        driver = self._init_driver()
-        all_links: Set[str] = set()
-        pages_loaded = 0
-
-        try:
-            logging.info("打开列表页: %s", LIST_URL)
-            driver.get(LIST_URL)
-            WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(self.delay)
+@dataclass
+class _JobTask:
+    """流水线中流转的单个岗位。"""
 
-            while True:
-                new_links = self._extract_links_from_dom(driver)
-                before = len(all_links)
-                all_links.update(new_links)
-                after = len(all_links)
-                logging.info("当前职位链接数: %s (+%s)", after, after - before)
+    index: int
+    url: str
+    response: Optional[requests.Response] = None
+    record: Optional[JobRecord] = None
+    from_cache: bool = False
 
-                pages_loaded += 1
-                if self.max_pages and pages_loaded >= self.max_pages:
-                    logging.info("达到 max-pages 限制（%s），停止加载更多。", self.max_pages)
-                    break
 
-                if not self._click_show_more(driver):
-                    logging.info("未找到“Show more results”按钮，结束抓取。")
-                    break
+# ---------------------------
+# 详情页解析
+# ---------------------------
 
-                time.sleep(self.delay)
 
-                if self.max_jobs and len(all_links) >= self.max_jobs:
-                    logging.info("达到 max-jobs 限制（%s），结束抓取。", self.max_jobs)
-                    break
+def _keyword_pattern(*keywords: str) -> "re.Pattern[str]":
+    """把关键词列表编译成一个交替正则，一次扫描即可判断是否包含任一关键词。"""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
 
-        finally:
-            self._close_driver()
 
-        links_sorted = sorted(all_links)
-        if self.max_jobs:
-            links_sorted = links_sorted[: self.max_jobs]
-        logging.info("最终共获取职位链接 %s 条。", len(links_sorted))
-        return links_sorted
+# 章节标题分类：先排除无关区块，再按 requirements → application → description 的优先级匹配
+IGNORE_HEADING_PATTERN = _keyword_pattern(
+    "working at",
+    "employer information",
+    "interesting for you",
+    "recommended jobs",
+    "related vacancies",
+    "share this job",
+    "contact",
+)
+SECTION_HEADING_PATTERNS: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    (
+        "requirements_en",
+        _keyword_pattern(
+            "requirement",
+            "qualification",
+            "who are you",
+            "profile",
+            "your profile",
+            "what you bring",
+            "skills",
+            "competence",
+            "functie-eisen",
+            "vereisten",
+            "wij vragen",
+        ),
+    ),
+    (
+        "application_steps_en",
+        _keyword_pattern(
+            "application",
+            "apply",
+            "procedure",
+            "how to apply",
+            "selection",
+            "sollicitatie",
+            "recruitment process",
+        ),
+    ),
+    (
+        "description_en",
+        _keyword_pattern(
+            "job description",
+            "about",
+            "position",
+            "role",
+            "introduction",
+            "project",
+            "what you will do",
+            "functiebeschrijving",
+            "we offer",
+        ),
+    ),
+)
+# JobPosting 描述中 <strong> 小标题的分类（未命中时 JSON 模式回到 description）
+JSONLD_STRONG_PATTERNS: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    ("requirements_en", _keyword_pattern("requirement")),
+    ("application_steps_en", _keyword_pattern("application", "procedure")),
+    ("description_en", _keyword_pattern("job description", "about")),
+)
+DOM_STRONG_PATTERNS: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    ("requirements_en", _keyword_pattern("requirement")),
+    ("application_steps_en", _keyword_pattern("application")),
+    ("description_en", _keyword_pattern("job description", "about")),
+)
+META_LABEL_CLASS = re.compile(r"text-sm.*uppercase.*text-gray-500")
+INTAKE_PATTERN = re.compile(r"(20\d{2})\s*(Fall|Spring|Summer|Winter)", re.IGNORECASE)
+INTAKE_REVERSE_PATTERN = re.compile(r"(Fall|Spring|Summer|Winter)\s*(20\d{2})", re.IGNORECASE)
+MULTI_NEWLINE_PATTERN = re.compile(r"\n{2,}")
+MULTI_SPACE_PATTERN = re.compile(r"[ \t]{2,}")
 
-    def _extract_links_from_dom(self, driver: Chrome) -> Set[str]:
-        anchors = driver.find_elements(By.CSS_SELECTOR, "a[href*='/en/jobs/']")
-        links: Set[str] = set()
-        for anchor in anchors:
-            href = anchor.get_attribute("href")
-            if not href:
-                continue
-            match = JOB_URL_PATTERN.match(href)
-            if not match:
-                continue
-            vacancy_id, slug = match.groups()
-            slug = (slug or "").strip("/")
-            if not slug:
-                # 如果链接缺少 slug，则采用原始 href 去除多余斜杠
-                normalized = href.split("?")[0].strip()
-                normalized = normalized.rstrip("/") + "/"
-            else:
-                normalized = f"https://www.academictransfer.com/en/jobs/{vacancy_id}/{slug}/"
-            links.add(normalized)
-        return links
 
-    def _click_show_more(self, driver: Chrome) -> bool:
-        """尝试点击 'Show more results' 按钮，成功返回 True。"""
-        try:
-            buttons = driver.find_elements(By.TAG_NAME, "button")
-            for button in buttons:
-                text = (button.text or "").strip()
-                if "Show more results" in text:
-                    logging.info("点击按钮: %s", text)
-                    prev_count = len(self._extract_links_from_dom(driver))
-                    try:
-                        button.click()
-                    except (ElementNotInteractableException, ElementClickInterceptedException):
-                        driver.execute_script("arguments[0].click();", button)
+def classify_keywords(
+    text: str, patterns: Tuple[Tuple[str, "re.Pattern[str]"], ...]
+) -> Optional[str]:
+    """返回第一个命中的类别（按 patterns 的优先级）。text 需已转为小写。"""
+    for key, pattern in patterns:
+        if pattern.search(text):
+            return key
+    return None
 
-                    WebDriverWait(driver, 30).until(
-                        lambda d: len(self._extract_links_from_dom(d)) > prev_count
-                    )
-                    return True
-        except TimeoutException:
-            logging.warning("等待新职位加载超时。")
-        except Exception as exc:
-            logging.error("点击“Show more results”时出错: %s", exc)
-        return False
 
-    # ---------------------------
-    # 详情解析
-    # ---------------------------
+class JobDetailParser:
+    """把详情页 HTML 解析为 JobRecord。无网络与共享状态，可在子进程中运行。"""
 
-    def fetch_job_detail(self, url: str) -> Optional[JobRecord]:
-        logging.info("解析岗位详情: %s", url)
-        try:
-            resp = self.session.get(url, timeout=self.http_timeout)
-            resp.raise_for_status()
-        except requests.RequestException as exc:
-            logging.error("请求详情页失败: %s | %s", url, exc)
-            return None
+    def __init__(self, backend: str = DEFAULT_PARSER) -> None:
+        self.backend = backend
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+    def parse(self, url: str, html: str) -> Optional[JobRecord]:
+        soup = make_soup(html, self.backend)
         ld_json = soup.find("script", attrs={"type": "application/ld+json"})
         if not ld_json:
             logging.error("未找到 JobPosting JSON: %s", url)
@@ -400,7 +323,7 @@ class AcademicTransferPhDSync:
         supports_international = self._infer_international_support(
             sections.get("description_en", ""), sections.get("requirements_en", "")
         )
-        status = self._derive_status(deadline_iso)
+        status = self.derive_status(deadline_iso)
         tags = self._collect_tags(meta, job_json, sections)
 
         record = JobRecord(
@@ -430,28 +353,23 @@ class AcademicTransferPhDSync:
             status=status,
             raw_payload=job_json,
         )
-
-        if self.enable_translation:
-            self._translate_record(record)
-
-        time.sleep(self.detail_delay)
         return record
 
     def _extract_meta_info(self, soup: BeautifulSoup) -> Dict[str, str]:
+        # 只遍历标签 <p>（灰色大写小字），值为紧随其后的兄弟 <p>；
+        # 与原实现一致，每个 div 只取其中第一个标签（即所在最内层 div 的第一个标签）
         meta: Dict[str, str] = {}
-        for container in soup.select("div"):
-            label = container.find(
-                "p",
-                attrs={"class": re.compile(r"text-sm.*uppercase.*text-gray-500")},
-            )
-            value = None
-            if label:
-                value = label.find_next_sibling("p")
-            if label and value:
-                key = label.get_text(strip=True)
-                val_text = value.get_text(" ", strip=True)
-                if key and val_text:
-                    meta[key] = val_text
+        for label in soup.find_all("p", attrs={"class": META_LABEL_CLASS}):
+            container = label.find_parent("div")
+            if container is None or container.find("p", attrs={"class": META_LABEL_CLASS}) is not label:
+                continue
+            value = label.find_next_sibling("p")
+            if not value:
+                continue
+            key = label.get_text(strip=True)
+            val_text = value.get_text(" ", strip=True)
+            if key and val_text:
+                meta[key] = val_text
         return meta
 
     def _extract_sections(self, soup: BeautifulSoup, job_json: Dict) -> Dict[str, str]:
@@ -465,7 +383,7 @@ class AcademicTransferPhDSync:
         if not html:
             return {k: "" for k in ["description_en", "requirements_en", "application_steps_en"]}
 
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html, self.backend)
         sections: Dict[str, List[str]] = {
             "description_en": [],
             "requirements_en": [],
@@ -488,16 +406,7 @@ class AcademicTransferPhDSync:
 
             if element.name == "strong":
                 heading = element.get_text(" ", strip=True).lower()
-                if "requirement" in heading:
-                    current = "requirements_en"
-                    continue
-                if "application" in heading or "procedure" in heading:
-                    current = "application_steps_en"
-                    continue
-                if "job description" in heading or "about" in heading:
-                    current = "description_en"
-                    continue
-                current = "description_en"
+                current = classify_keywords(heading, JSONLD_STRONG_PATTERNS) or "description_en"
                 continue
 
             if element.name in {"li"}:
@@ -515,59 +424,9 @@ class AcademicTransferPhDSync:
         if not heading:
             return None
         normalized = heading.lower()
-        ignore_keywords = [
-            "working at",
-            "employer information",
-            "interesting for you",
-            "recommended jobs",
-            "related vacancies",
-            "share this job",
-            "contact",
-        ]
-        if any(keyword in normalized for keyword in ignore_keywords):
+        if IGNORE_HEADING_PATTERN.search(normalized):
             return None
-
-        requirements_keywords = [
-            "requirement",
-            "qualification",
-            "who are you",
-            "profile",
-            "your profile",
-            "what you bring",
-            "skills",
-            "competence",
-            "functie-eisen",
-            "vereisten",
-            "wij vragen",
-        ]
-        application_keywords = [
-            "application",
-            "apply",
-            "procedure",
-            "how to apply",
-            "selection",
-            "sollicitatie",
-            "recruitment process",
-        ]
-        description_keywords = [
-            "job description",
-            "about",
-            "position",
-            "role",
-            "introduction",
-            "project",
-            "what you will do",
-            "functiebeschrijving",
-            "we offer",
-        ]
-
-        if any(keyword in normalized for keyword in requirements_keywords):
-            return "requirements_en"
-        if any(keyword in normalized for keyword in application_keywords):
-            return "application_steps_en"
-        if any(keyword in normalized for keyword in description_keywords):
-            return "description_en"
-        return None
+        return classify_keywords(normalized, SECTION_HEADING_PATTERNS)
 
     def _extract_text_from_section(self, section: Tag) -> str:
         pieces: List[str] = []
@@ -661,14 +520,9 @@ class AcademicTransferPhDSync:
 
             if element.name == "strong":
                 heading = element.get_text(" ", strip=True).lower()
-                if "requirement" in heading:
-                    current = "requirements_en"
-                    continue
-                if "application" in heading:
-                    current = "application_steps_en"
-                    continue
-                if "job description" in heading or "about" in heading:
-                    current = "description_en"
+                section_key = classify_keywords(heading, DOM_STRONG_PATTERNS)
+                if section_key:
+                    current = section_key
                     continue
 
             if element.name in {"script", "style"}:
@@ -744,7 +598,7 @@ class AcademicTransferPhDSync:
         keywords = ["international", "global", "worldwide", "non-eu", "visa", "relocation"]
         return any(keyword in combined for keyword in keywords)
 
-    def _derive_status(self, deadline_iso: Optional[str]) -> str:
+    def derive_status(self, deadline_iso: Optional[str]) -> str:
         if not deadline_iso:
             return "open"
         try:
@@ -779,98 +633,747 @@ class AcademicTransferPhDSync:
         return sorted(tag for tag in tags if tag)
 
     def _detect_intake(self, text: str) -> Optional[str]:
-        pattern = re.compile(r"(20\d{2})\s*(Fall|Spring|Summer|Winter)", re.IGNORECASE)
-        match = pattern.search(text)
+        match = INTAKE_PATTERN.search(text)
         if match:
             year, season = match.groups()
             return f"{year} {season.capitalize()}"
-        reverse_pattern = re.compile(r"(Fall|Spring|Summer|Winter)\s*(20\d{2})", re.IGNORECASE)
-        match = reverse_pattern.search(text)
+        match = INTAKE_REVERSE_PATTERN.search(text)
         if match:
             season, year = match.groups()
             return f"{year} {season.capitalize()}"
         return None
 
     def _clean_text(self, text: str) -> str:
-        text = re.sub(r"\n{2,}", "\n", text)
-        text = re.sub(r"[ \t]{2,}", " ", text)
+        text = MULTI_NEWLINE_PATTERN.sub("\n", text)
+        text = MULTI_SPACE_PATTERN.sub(" ", text)
         text = text.replace("\u00a0", " ").strip()
         return text
 
+
+_WORKER_PARSERS: Dict[str, JobDetailParser] = {}
+
+
+def _parse_job_page(url: str, html: str, backend: str = DEFAULT_PARSER) -> Optional[JobRecord]:
+    """进程池入口：每个子进程按解析后端复用一个解析器实例。"""
+    parser = _WORKER_PARSERS.get(backend)
+    if parser is None:
+        parser = _WORKER_PARSERS[backend] = JobDetailParser(backend)
+    return parser.parse(url, html)
+
+
+_STAGE_DONE = object()
+
+
+def _start_stage(
+    name: str,
+    func,
+    inbox: "queue.Queue",
+    outbox: "queue.Queue",
+    workers: int,
+    abort: threading.Event,
+    errors: List[BaseException],
+) -> List[threading.Thread]:
+    """
+    启动 `workers` 个线程消费 inbox，把非 None 结果放入 outbox。
+    所有线程退出后向 outbox 发送结束标记；预算耗尽等致命错误会中止整条流水线。
+    """
+    remaining = [workers]
+    lock = threading.Lock()
+
+    def worker() -> None:
+        try:
+            while True:
+                item = inbox.get()
+                if item is _STAGE_DONE:
+                    inbox.put(_STAGE_DONE)  # 让同阶段其他线程也能退出
+                    return
+                if abort.is_set():
+                    continue  # 中止后只排空队列，避免上游阻塞在 put 上
+                try:
+                    result = func(item)
+                except ErrorBudgetExhausted as exc:
+                    errors.append(exc)
+                    abort.set()
+                    continue
+                except Exception as exc:
+                    logging.exception("%s 阶段处理失败 %s: %s", name, getattr(item, "url", item), exc)
+                    continue
+                if result is not None:
+                    outbox.put(result)
+        finally:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                outbox.put(_STAGE_DONE)
+
+    threads = [
+        threading.Thread(target=worker, name=f"{name}-{i}", daemon=True)
+        for i in range(max(workers, 1))
+    ]
+    remaining[0] = len(threads)
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+# ---------------------------
+# Supabase 流式写入
+# ---------------------------
+
+
+class ContentHashIndex:
+    """
+    本地记录每个 source_id 最近一次成功写入的 content_hash。
+    文件不存在时由调用方从 Supabase 拉取一次进行初始化。
+    """
+
+    def __init__(self, path: Optional[Path]) -> None:
+        self.path = path
+        self.hashes: Dict[str, str] = {}
+        self.loaded = False
+        self._dirty = False
+        if path and path.exists():
+            try:
+                self.hashes = json.loads(path.read_text(encoding="utf-8"))
+                self.loaded = True
+            except (OSError, json.JSONDecodeError) as exc:
+                logging.warning("无法读取内容指纹索引 %s，将重新初始化：%s", path, exc)
+
+    def is_unchanged(self, source_id: str, content_hash: str) -> bool:
+        return self.hashes.get(source_id) == content_hash
+
+    def update(self, items: Dict[str, str]) -> None:
+        if items:
+            self.hashes.update(items)
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self.path or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.hashes, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(self.path)
+        self._dirty = False
+
+
+class SupabaseStreamWriter:
+    """
+    边抓取边写入：记录攒满 `batch_size` 条就交给后台线程 upsert，
+    数据库写入与抓取重叠；close() 会写出剩余记录，中途崩溃也能保留已写入的部分。
+    """
+
+    def __init__(
+        self,
+        post_chunk: Callable[[List[JobRecord]], None],
+        batch_size: int,
+        max_pending: int = 4,
+    ) -> None:
+        self.post_chunk = post_chunk
+        self.batch_size = max(batch_size, 1)
+        self.written = 0
+        self._buffer: List[JobRecord] = []
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(max_pending, 1))
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._worker, name="supabase-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, record: JobRecord) -> None:
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) < self.batch_size:
+                return
+            chunk, self._buffer = self._buffer, []
+        self._queue.put(chunk)
+
+    def flush(self) -> None:
+        """把未满一批的记录立即交给后台线程。"""
+        with self._lock:
+            chunk, self._buffer = self._buffer, []
+        if chunk:
+            self._queue.put(chunk)
+
+    def close(self) -> None:
+        """写出剩余记录并等待后台线程结束；后台写入的错误在此重新抛出。"""
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        if self._error:
+            raise self._error
+
+    def _worker(self) -> None:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if self._error:
+                continue  # 已出错：只排空队列，不再请求，避免 add()/close() 阻塞
+            try:
+                self.post_chunk(chunk)
+                self.written += len(chunk)
+            except ErrorBudgetExhausted as exc:
+                self._error = exc
+            except Exception as exc:
+                logging.exception("后台写入 Supabase 失败（%s 条记录）: %s", len(chunk), exc)
+                self._error = exc
+
+    def __enter__(self) -> "SupabaseStreamWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ---------------------------
+# 同步主类
+# ---------------------------
+
+
+class AcademicTransferPhDSync:
+    def __init__(
+        self,
+        *,
+        max_pages: int = 8,
+        link_source: str = "browser",
+        delay: float = 2.5,
+        detail_delay: float = 1.0,
+        fetch_workers: int = 4,
+        parse_workers: int = 2,
+        translate_workers: int = 2,
+        queue_size: int = 32,
+        max_jobs: Optional[int] = None,
+        headless: bool = True,
+        dry_run: bool = False,
+        enable_translation: bool = False,
+        output_path: Optional[Path] = None,
+        log_file: Optional[Path] = None,
+        supabase_url: Optional[str] = None,
+        supabase_key: Optional[str] = None,
+        supabase_table: str = DEFAULT_SUPABASE_TABLE,
+        supabase_batch_size: int = 50,
+        http_timeout: int = 30,
+        max_retries: int = 4,
+        error_budget: int = 100,
+        cache_dir: Optional[Path] = None,
+        cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        hash_index_path: Optional[Path] = DEFAULT_HASH_INDEX,
+        skip_unchanged: bool = True,
+        translation_db: Optional[Path] = DEFAULT_TRANSLATION_DB,
+        translation_batch_chars: int = DEFAULT_MAX_CHARS,
+        parser_backend: str = DEFAULT_PARSER,
+        block_resources: str = DEFAULT_BLOCK_PROFILE,
+    ) -> None:
+        if link_source not in LINK_SOURCES:
+            raise ValueError(f"不支持的链接来源：{link_source}")
+        self.max_pages = max_pages
+        self.link_source = link_source
+        self.delay = delay
+        self.detail_delay = detail_delay
+        self.fetch_workers = max(fetch_workers, 1)
+        self.parse_workers = max(parse_workers, 0)
+        self.translate_workers = max(translate_workers, 1)
+        self.queue_size = max(queue_size, 1)
+        self.max_jobs = max_jobs
+        self.headless = headless
+        self.block_resources = block_resources
+        self.dry_run = dry_run
+        self.enable_translation = enable_translation
+        self.output_path = output_path
+        self.supabase_url = (supabase_url or os.getenv("VITE_SUPABASE_URL", "")).rstrip("/")
+        self.supabase_key = (
+            supabase_key
+            or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+            or os.getenv("VITE_SUPABASE_SERVICE_ROLE_KEY")
+            or os.getenv("VITE_SUPABASE_ANON_KEY", "")
+        )
+        self.supabase_table = supabase_table
+        self.supabase_batch_size = supabase_batch_size
+        self.http_timeout = http_timeout
+
+        # 带连接池与指数退避重试的会话；429/5xx 不再直接丢弃记录
+        self.session = create_session(
+            pool_size=self.fetch_workers + self.translate_workers,
+            max_retries=max_retries,
+            error_budget=ErrorBudget(error_budget),
+            headers={
+                "User-Agent": (
+                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+                    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0 Safari/537.36"
+                ),
+                "Accept-Language": "en-US,en;q=0.9",
+            },
+        )
+
+        # 详情页磁盘缓存：命中 304 时直接复用上次解析的 JobRecord
+        self.cache = HttpCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.parser = JobDetailParser(check_parser(parser_backend))
+        self.translator: Optional[Translator] = None
+        if enable_translation:
+            self.translator = Translator(
+                self.session,
+                TranslationMemory(translation_db),
+                max_chars=translation_batch_chars,
+                timeout=15,
+            )
+        self.skip_unchanged = skip_unchanged
+        self.hash_index = ContentHashIndex(hash_index_path if skip_unchanged else None)
+
+        self._driver: Optional[Chrome] = None
+
+        self._setup_logging(log_file)
+        logging.debug(
+            "AcademicTransferPhDSync initialized with params: %s",
+            {
+                "max_pages": max_pages,
+                "link_source": link_source,
+                "delay": delay,
+                "detail_delay": detail_delay,
+                "fetch_workers": self.fetch_workers,
+                "parse_workers": self.parse_workers,
+                "translate_workers": self.translate_workers,
+                "max_jobs": max_jobs,
+                "headless": headless,
+                "block_resources": block_resources,
+                "dry_run": dry_run,
+                "enable_translation": enable_translation,
+                "output_path": str(output_path) if output_path else None,
+                "supabase_url": self.supabase_url,
+                "supabase_table": supabase_table,
+            },
+        )
+
+    # ---------------------------
+    # Logging & Driver
+    # ---------------------------
+
+    def _setup_logging(self, log_file: Optional[Path]) -> None:
+        handlers = [logging.StreamHandler(sys.stdout)]
+        if log_file:
+            handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s [%(levelname)s] %(message)s",
+            handlers=handlers,
+        )
+
+    def _init_driver(self) -> Chrome:
+        if webdriver is None:
+            raise RuntimeError("未安装 selenium，无法使用浏览器模式；请安装 selenium 或使用 --link-source api")
+        options = Options()
+        if self.headless:
+            options.add_argument("--headless")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument(
+            "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) Chrome/118.0 Safari/537.36"
+        )
+        configure_options(options, self.block_resources)
+        try:
+            driver = webdriver.Chrome(options=options)
+        except WebDriverException as exc:
+            logging.error("无法初始化 ChromeDriver，请确认已安装驱动。\n%s", exc)
+            raise
+        enable_blocking(driver, self.block_resources)
+
+        self._driver = driver
+        return driver
+
+    def _close_driver(self) -> None:
+        if self._driver:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            finally:
+                self._driver = None
+
+    # ---------------------------
+    # 爬虫流程
+    # ---------------------------
+
+    def collect_job_links(self) -> List[str]:
+        if self.link_source == "api":
+            return self._collect_job_links_from_api()
+        return self._collect_job_links_from_browser()
+
+    def _collect_job_links_from_api(self) -> List[str]:
+        """通过公开数据 API 枚举岗位 ID，无需启动浏览器。"""
+        logging.info("通过 AcademicTransfer API 获取职位列表")
+        token_provider = PublicTokenProvider("en", session=self.session)
+        params = {"page_size": 100, "function_types": 1, "is_active": "true"}
+        listing, meta = fetch_paginated_results(
+            token_provider.headers(),
+            params,
+            session=self.session,
+            token_provider=token_provider,
+            concurrency=4,
+        )
+        logging.info("API 返回职位 %s 条（count=%s）", len(listing), meta.get("count"))
+
+        all_links: Set[str] = set()
+        for item in listing:
+            link = self._link_from_listing_item(item)
+            if link:
+                all_links.add(link)
+
+        links_sorted = sorted(all_links)
+        if self.max_jobs:
+            links_sorted = links_sorted[: self.max_jobs]
+        logging.info("最终共获取职位链接 %s 条。", len(links_sorted))
+        return links_sorted
+
+    @staticmethod
+    def _link_from_listing_item(item: Dict) -> Optional[str]:
+        vacancy_id = item.get("id")
+        slug = item.get("slug") or ""
+        match = JOB_PATH_PATTERN.search(item.get("absolute_url") or "")
+        if match:
+            vacancy_id = match.group(1)
+            slug = slug or match.group(2)
+        if not vacancy_id:
+            return None
+        if slug:
+            return f"https://www.academictransfer.com/en/jobs/{vacancy_id}/{slug.strip('/')}/"
+        return f"https://www.academictransfer.com/en/jobs/{vacancy_id}/"
+
+    def _collect_job_links_from_browser(self) -> List[str]:
+        driver = self._init_driver()
+        all_links: Set[str] = set()
+        pages_loaded = 0
+
+        try:
+            logging.info("打开列表页: %s", LIST_URL)
+            driver.get(LIST_URL)
+            WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            time.sleep(self.delay)
+
+            while True:
+                new_links = self._extract_links_from_dom(driver)
+                before = len(all_links)
+                all_links.update(new_links)
+                after = len(all_links)
+                logging.info("当前职位链接数: %s (+%s)", after, after - before)
+
+                pages_loaded += 1
+                if self.max_pages and pages_loaded >= self.max_pages:
+                    logging.info("达到 max-pages 限制（%s），停止加载更多。", self.max_pages)
+                    break
+
+                if not self._click_show_more(driver):
+                    logging.info("未找到“Show more results”按钮，结束抓取。")
+                    break
+
+                time.sleep(self.delay)
+
+                if self.max_jobs and len(all_links) >= self.max_jobs:
+                    logging.info("达到 max-jobs 限制（%s），结束抓取。", self.max_jobs)
+                    break
+
+        finally:
+            self._close_driver()
+
+        links_sorted = sorted(all_links)
+        if self.max_jobs:
+            links_sorted = links_sorted[: self.max_jobs]
+        logging.info("最终共获取职位链接 %s 条。", len(links_sorted))
+        return links_sorted
+
+    def _extract_links_from_dom(self, driver: Chrome) -> Set[str]:
+        anchors = driver.find_elements(By.CSS_SELECTOR, "a[href*='/en/jobs/']")
+        links: Set[str] = set()
+        for anchor in anchors:
+            href = anchor.get_attribute("href")
+            if not href:
+                continue
+            match = JOB_URL_PATTERN.match(href)
+            if not match:
+                continue
+            vacancy_id, slug = match.groups()
+            slug = (slug or "").strip("/")
+            if not slug:
+                # 如果链接缺少 slug，则采用原始 href 去除多余斜杠
+                normalized = href.split("?")[0].strip()
+                normalized = normalized.rstrip("/") + "/"
+            else:
+                normalized = f"https://www.academictransfer.com/en/jobs/{vacancy_id}/{slug}/"
+            links.add(normalized)
+        return links
+
+    def _click_show_more(self, driver: Chrome) -> bool:
+        """尝试点击 'Show more results' 按钮，成功返回 True。"""
+        try:
+            buttons = driver.find_elements(By.TAG_NAME, "button")
+            for button in buttons:
+                text = (button.text or "").strip()
+                if "Show more results" in text:
+                    logging.info("点击按钮: %s", text)
+                    prev_count = len(self._extract_links_from_dom(driver))
+                    try:
+                        button.click()
+                    except (ElementNotInteractableException, ElementClickInterceptedException):
+                        driver.execute_script("arguments[0].click();", button)
+
+                    WebDriverWait(driver, 30).until(
+                        lambda d: len(self._extract_links_from_dom(d)) > prev_count
+                    )
+                    return True
+        except TimeoutException:
+            logging.warning("等待新职位加载超时。")
+        except Exception as exc:
+            logging.error("点击“Show more results”时出错: %s", exc)
+        return False
+
+    # ---------------------------
+    # 详情抓取
+    # ---------------------------
+
+    def fetch_job_detail(self, url: str) -> Optional[JobRecord]:
+        """串行抓取单个岗位：下载 → 解析 → 翻译 / 写缓存。"""
+        task = self._download_job(_JobTask(index=0, url=url))
+        if task:
+            task = self._parse_job(task)
+        if task:
+            task = self._finish_job(task)
+        time.sleep(self.detail_delay)
+        return task.record if task else None
+
+    def _download_job(self, task: "_JobTask") -> Optional["_JobTask"]:
+        """I/O 阶段：条件请求详情页；304 时直接复用缓存记录。"""
+        url = task.url
+        logging.info("解析岗位详情: %s", url)
+        cached = self.cache.get(url) if self.cache else None
+        try:
+            resp = self.session.get(
+                url,
+                timeout=self.http_timeout,
+                headers=cached.conditional_headers() if cached else None,
+            )
+            if cached and cached.record and resp.status_code == 304:
+                logging.info("详情页未变化（304），复用缓存记录: %s", url)
+                record = JobRecord(**cached.record)
+                record.last_scraped_at = datetime.now(timezone.utc).isoformat()
+                record.status = self.parser.derive_status(record.deadline)
+                task.record = record
+                task.from_cache = True
+                return task
+            resp.raise_for_status()
+        except requests.RequestException as exc:
+            logging.error("请求详情页失败: %s | %s", url, exc)
+            return None
+        task.response = resp
+        return task
+
+    def _parse_job(
+        self, task: "_JobTask", pool: Optional[ProcessPoolExecutor] = None
+    ) -> Optional["_JobTask"]:
+        """CPU 阶段：BeautifulSoup 解析，可交给进程池执行。"""
+        if task.record is not None:
+            return task
+        html = task.response.text
+        if pool:
+            task.record = pool.submit(_parse_job_page, task.url, html, self.parser.backend).result()
+        else:
+            task.record = self.parser.parse(task.url, html)
+        return task if task.record else None
+
+    def _finish_job(self, task: "_JobTask") -> Optional["_JobTask"]:
+        """翻译阶段：可选翻译，并把最终记录写入详情页缓存。"""
+        if task.from_cache:
+            return task
+        if self.enable_translation:
+            self._translate_record(task.record)
+        if self.cache and task.response is not None:
+            self.cache.store(task.url, task.response, asdict(task.record))
+        task.response = None
+        return task
+
     # ---------------------------
     # 翻译
     # ---------------------------
 
     def _translate_record(self, record: JobRecord) -> None:
-        for field_en, field_zh in [
+        """一条岗位的所有字段一起查翻译记忆，未命中的段落合并成批量请求。"""
+        fields = [
             ("title_en", "title_zh"),
             ("description_en", "description_zh"),
             ("requirements_en", "requirements_zh"),
             ("application_steps_en", "application_steps_zh"),
-        ]:
-            text = getattr(record, field_en)
-            if not text:
-                continue
-            translated = self._translate_text(text)
+        ]
+        pending = [(field_zh, getattr(record, field_en)) for field_en, field_zh in fields]
+        pending = [(field_zh, text) for field_zh, text in pending if text]
+        if not pending:
+            return
+        translations = self.translator.translate_many([text for _, text in pending])
+        for (field_zh, _), translated in zip(pending, translations):
             if translated:
                 setattr(record, field_zh, translated)
 
-    def _translate_text(self, text: str, target_lang: str = "zh-CN") -> Optional[str]:
-        payload = {
-            "client": "gtx",
-            "sl": "auto",
-            "tl": target_lang,
-            "dt": "t",
-            "q": text,
-        }
-        try:
-            resp = self.session.get(TRANSLATE_ENDPOINT, params=payload, timeout=15)
-            resp.raise_for_status()
-            data = resp.json()
-            translated = "".join(segment[0] for segment in data[0])
-            return translated.strip()
-        except Exception as exc:  # pragma: no cover - 外部 API 不稳定
-            logging.warning("翻译失败（%s...）：%s", text[:30], exc)
-            return None
-
     # ---------------------------
     # Supabase 写入
     # ---------------------------
 
-    def upsert_supabase(self, records: List[JobRecord]) -> None:
+    def _supabase_configured(self) -> bool:
         if not self.supabase_url or not self.supabase_key:
             logging.warning("未配置 Supabase URL 或 Key，跳过写入。")
+            return False
+        return True
+
+    def upsert_supabase(self, records: List[JobRecord]) -> None:
+        if not self._supabase_configured():
             return
 
-        endpoint = f"{self.supabase_url}/rest/v1/{self.supabase_table}"
-        headers = {
+        logging.info("开始写入 Supabase（批量大小：%s）", self.supabase_batch_size)
+        self._prepare_hash_index()
+
+        for chunk in self._chunk(records, self.supabase_batch_size):
+            self._write_chunk(chunk)
+        self.hash_index.save()
+
+    def _supabase_headers(self, prefer: str) -> Dict[str, str]:
+        return {
             "apikey": self.supabase_key,
             "Authorization": f"Bearer {self.supabase_key}",
             "Content-Type": "application/json",
-            "Prefer": "resolution=merge-duplicates,return=minimal",
+            "Prefer": prefer,
         }
 
-        logging.info("开始写入 Supabase（批量大小：%s）", self.supabase_batch_size)
-
-        for chunk in self._chunk(records, self.supabase_batch_size):
-            payload = [record.to_dict() for record in chunk]
+    def _prepare_hash_index(self) -> None:
+        """本地指纹索引不存在时，从 Supabase 读取已写入的 content_hash 作为初始值。"""
+        if not self.skip_unchanged or self.hash_index.loaded:
+            return
+        endpoint = f"{self.supabase_url}/rest/v1/{self.supabase_table}"
+        page_size = 1000
+        offset = 0
+        fetched: Dict[str, str] = {}
+        while True:
             try:
-                resp = self.session.post(
+                resp = self.session.get(
                     endpoint,
-                    headers=headers,
-                    data=json.dumps(payload),
+                    headers=self._supabase_headers("count=none"),
+                    params={
+                        "select": "source_id,content_hash",
+                        "source": "eq.academictransfer",
+                        "limit": page_size,
+                        "offset": offset,
+                    },
                     timeout=self.http_timeout,
                 )
-                if not resp.ok:
-                    logging.error(
-                        "Supabase upsert 失败（HTTP %s）：%s",
-                        resp.status_code,
-                        resp.text[:500],
-                    )
-                else:
-                    logging.info("Supabase upsert 成功，记录数：%s", len(payload))
             except requests.RequestException as exc:
-                logging.error("Supabase upsert 请求异常：%s", exc)
+                logging.warning("读取已有 content_hash 失败，本次全部 upsert：%s", exc)
+                return
+            if not resp.ok:
+                logging.warning(
+                    "读取已有 content_hash 失败（HTTP %s），本次全部 upsert：%s",
+                    resp.status_code,
+                    resp.text[:200],
+                )
+                return
+            rows = resp.json()
+            for row in rows:
+                if row.get("content_hash"):
+                    fetched[str(row["source_id"])] = row["content_hash"]
+            if len(rows) < page_size:
+                break
+            offset += page_size
+        self.hash_index.update(fetched)
+        self.hash_index.loaded = True
+        logging.info("已从 Supabase 初始化内容指纹索引：%s 条", len(fetched))
+
+    def _write_chunk(self, chunk: List[JobRecord]) -> None:
+        """
+        内容变化的记录走 upsert；本地指纹未变化的只批量刷新 last_scraped_at。
+        PATCH 返回受影响行的 content_hash：行已被删除或指纹与本地不一致时改为 upsert。
+        """
+        payloads = [record.to_dict() for record in chunk]
+        if not self.skip_unchanged:
+            self._post_upsert(payloads)
+            return
+        changed: List[Dict] = []
+        unchanged: Dict[str, Dict] = {}
+        for payload in payloads:
+            if self.hash_index.is_unchanged(payload["source_id"], payload["content_hash"]):
+                unchanged[payload["source_id"]] = payload
+            else:
+                changed.append(payload)
+        if unchanged:
+            stale_ids = self._touch_unchanged(unchanged)
+            changed.extend(unchanged[sid] for sid in stale_ids)
+        if changed and self._post_upsert(changed):
+            self.hash_index.update({p["source_id"]: p["content_hash"] for p in changed})
+
+    def _post_upsert(self, payload: List[Dict]) -> bool:
+        endpoint = f"{self.supabase_url}/rest/v1/{self.supabase_table}"
+        try:
+            resp = self.session.post(
+                endpoint,
+                headers=self._supabase_headers("resolution=merge-duplicates,return=minimal"),
+                data=json.dumps(payload),
+                timeout=self.http_timeout,
+            )
+            if not resp.ok:
+                logging.error(
+                    "Supabase upsert 失败（HTTP %s）：%s",
+                    resp.status_code,
+                    resp.text[:500],
+                )
+                return False
+            logging.info("Supabase upsert 成功，记录数：%s", len(payload))
+            return True
+        except requests.RequestException as exc:
+            logging.error("Supabase upsert 请求异常：%s", exc)
+            return False
+
+    def _touch_unchanged(self, payloads: Dict[str, Dict]) -> List[str]:
+        """
+        一次 PATCH 刷新未变化岗位的 last_scraped_at，避免重写整行。
+        返回 Supabase 中缺失或 content_hash 不一致、需要重新 upsert 的 source_id。
+        """
+        endpoint = f"{self.supabase_url}/rest/v1/{self.supabase_table}"
+        quoted = ",".join('"{}"'.format(sid.replace('"', '\\"')) for sid in payloads)
+        try:
+            resp = self.session.patch(
+                endpoint,
+                headers=self._supabase_headers("return=representation"),
+                params={
+                    "source": "eq.academictransfer",
+                    "source_id": f"in.({quoted})",
+                    "select": "source_id,content_hash",
+                },
+                data=json.dumps({"last_scraped_at": datetime.now(timezone.utc).isoformat()}),
+                timeout=self.http_timeout,
+            )
+            if not resp.ok:
+                logging.error(
+                    "刷新 last_scraped_at 失败（HTTP %s）：%s",
+                    resp.status_code,
+                    resp.text[:500],
+                )
+                return []
+            rows = resp.json()
+        except (requests.RequestException, ValueError) as exc:
+            logging.error("刷新 last_scraped_at 请求异常：%s", exc)
+            return []
+        remote = {str(row.get("source_id")): row.get("content_hash") for row in rows}
+        stale_ids = [
+            sid for sid, payload in payloads.items() if remote.get(sid) != payload["content_hash"]
+        ]
+        logging.info(
+            "内容未变化，跳过 upsert 并刷新 last_scraped_at：%s 条",
+            len(payloads) - len(stale_ids),
+        )
+        if stale_ids:
+            logging.warning(
+                "Supabase 中 %s 条记录缺失或 content_hash 不一致，改为 upsert", len(stale_ids)
+            )
+        return stale_ids
 
     @staticmethod
     def _chunk(iterable: Iterable[JobRecord], size: int) -> Iterable[List[JobRecord]]:
@@ -885,16 +1388,36 @@ class AcademicTransferPhDSync:
 
     def run(self) -> None:
         links = self.collect_job_links()
-        records: List[JobRecord] = []
-        failed_links: List[str] = []
-
-        for idx, link in enumerate(links, start=1):
-            logging.info("处理岗位 [%s/%s]", idx, len(links))
-            record = self.fetch_job_detail(link)
-            if record:
-                records.append(record)
-            else:
-                failed_links.append(link)
+
+        writer: Optional[SupabaseStreamWriter] = None
+        if self.dry_run:
+            logging.info("dry-run 模式：仅输出数据，不写入 Supabase。")
+        elif self._supabase_configured():
+            logging.info("开始流式写入 Supabase（批量大小：%s）", self.supabase_batch_size)
+            self._prepare_hash_index()
+            writer = SupabaseStreamWriter(self._write_chunk, self.supabase_batch_size)
+
+        try:
+            records, failed_links = self._process_links(
+                links, on_record=writer.add if writer else None
+            )
+        finally:
+            # 正常结束、异常或 Ctrl+C（SIGINT）时都把缓冲区中的记录写出
+            if writer:
+                try:
+                    writer.close()
+                finally:
+                    self.hash_index.save()
+                logging.info("Supabase 写入完成，累计记录数：%s", writer.written)
+
+        if self.translator:
+            logging.info(
+                "翻译记忆命中 %s 段，未命中 %s 段（命中率 %.1f%%），翻译请求 %s 次",
+                self.translator.hits,
+                self.translator.misses,
+                self.translator.hit_rate * 100,
+                self.translator.requests,
+            )
 
         if failed_links:
             logging.warning("共有 %s 个岗位解析失败。", len(failed_links))
@@ -908,11 +1431,85 @@ class AcademicTransferPhDSync:
         if self.output_path:
             self._write_output(records, failed_links)
 
-        if self.dry_run:
-            logging.info("dry-run 模式：仅输出数据，不写入 Supabase。")
-            return
+    def _process_links(
+        self,
+        links: List[str],
+        on_record: Optional[Callable[[JobRecord], None]] = None,
+    ) -> Tuple[List[JobRecord], List[str]]:
+        """
+        分阶段流水线：下载（限速的 I/O 线程池）→ 解析（进程池）→ 翻译（独立线程池）。
+        阶段之间用有界队列衔接，总耗时取决于最慢的阶段而不是各阶段之和。
+        每完成一条记录即调用 on_record（完成顺序）；返回按输入顺序排列的记录与失败链接。
+        """
+        total = len(links)
+        link_q: "queue.Queue" = queue.Queue()
+        parse_q: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        finish_q: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        done_q: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        for idx, link in enumerate(links):
+            link_q.put(_JobTask(index=idx, url=link))
+        link_q.put(_STAGE_DONE)
+
+        # detail_delay 作为全局限速（1 / detail_delay 次/秒），由所有下载线程共享
+        limiter = TokenBucket.from_delay(self.detail_delay)
+
+        def download(task: _JobTask) -> Optional[_JobTask]:
+            if limiter:
+                limiter.acquire()
+            return self._download_job(task)
+
+        pool = None
+        if self.parse_workers > 0:
+            pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
 
-        self.upsert_supabase(records)
+        abort = threading.Event()
+        errors: List[BaseException] = []
+        results: Dict[int, JobRecord] = {}
+        try:
+            threads = (
+                _start_stage("fetch", download, link_q, parse_q, self.fetch_workers, abort, errors)
+                + _start_stage(
+                    "parse",
+                    lambda task: self._parse_job(task, pool),
+                    parse_q,
+                    finish_q,
+                    max(self.parse_workers, 1),
+                    abort,
+                    errors,
+                )
+                + _start_stage(
+                    "translate",
+                    self._finish_job,
+                    finish_q,
+                    done_q,
+                    self.translate_workers if self.enable_translation else 1,
+                    abort,
+                    errors,
+                )
+            )
+            while True:
+                task = done_q.get()
+                if task is _STAGE_DONE:
+                    break
+                results[task.index] = task.record
+                if on_record:
+                    on_record(task.record)
+                logging.info("处理岗位 [%s/%s]", len(results), total)
+            for thread in threads:
+                thread.join()
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+        if errors:
+            raise errors[0]
+
+        records = [results[idx] for idx in sorted(results)]
+        failed_links = [link for idx, link in enumerate(links) if idx not in results]
+        return records, failed_links
 
     def _write_output(self, records: List[JobRecord], failed_links: List[str]) -> None:
         output = {
@@ -935,30 +1532,65 @@ class AcademicTransferPhDSync:
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="同步 AcademicTransfer 博士岗位")
     parser.add_argument("--max-pages", type=int, default=8, help="最多点击“Show more”次数")
+    parser.add_argument(
+        "--link-source",
+        choices=LINK_SOURCES,
+        default="browser",
+        help="岗位链接来源：browser=Selenium 列表页，api=公开数据 API（无需浏览器）",
+    )
     parser.add_argument("--max-jobs", type=int, help="限制抓取的岗位数量（调试用）")
     parser.add_argument("--delay", type=float, default=2.5, help="列表页加载间隔（秒）")
-    parser.add_argument("--detail-delay", type=float, default=1.0, help="详情页请求间隔（秒）")
+    parser.add_argument("--detail-delay", type=float, default=1.0, help="详情页请求间隔（秒，所有下载线程共享的全局限速）")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default=DEFAULT_PARSER, help="详情页 HTML 解析后端（lxml 需安装 lxml 包）")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="详情页下载线程数")
+    parser.add_argument("--parse-workers", type=int, default=2, help="解析进程数（0 表示在线程内解析）")
+    parser.add_argument("--translate-workers", type=int, default=2, help="翻译线程数")
+    parser.add_argument("--queue-size", type=int, default=32, help="流水线阶段之间的队列容量")
     parser.add_argument("--no-headless", action="store_true", help="禁用 headless（调试用）")
+    parser.add_argument(
+        "--block-resources",
+        choices=list(BLOCK_PROFILES),
+        default=DEFAULT_BLOCK_PROFILE,
+        help="列表页浏览器屏蔽的资源：media=图片/字体/音视频，lean=再加统计脚本，full=再加CSS（默认 none）",
+    )
     parser.add_argument("--dry-run", action="store_true", help="仅抓取数据，不写入 Supabase")
     parser.add_argument("--enable-translation", action="store_true", help="启用中文翻译")
+    parser.add_argument("--translation-db", type=Path, default=DEFAULT_TRANSLATION_DB, help="翻译记忆 SQLite 文件（按段落缓存，跨运行复用）")
+    parser.add_argument("--translation-batch-chars", type=int, default=DEFAULT_MAX_CHARS, help="单次翻译请求的最大字符数（未命中段落合并发送）")
     parser.add_argument("--output", type=Path, help="输出 JSON 文件路径")
     parser.add_argument("--log-file", type=Path, help="日志文件路径")
     parser.add_argument("--supabase-url", type=str, help="Supabase URL（可覆盖环境变量）")
     parser.add_argument("--supabase-key", type=str, help="Supabase Key（可覆盖环境变量）")
     parser.add_argument("--supabase-table", type=str, default=DEFAULT_SUPABASE_TABLE, help="Supabase 表名")
     parser.add_argument("--supabase-batch-size", type=int, default=50, help="Supabase upsert 批量大小")
+    parser.add_argument("--hash-index", type=Path, default=DEFAULT_HASH_INDEX, help="本地内容指纹索引文件（跳过未变化记录）")
+    parser.add_argument("--no-skip-unchanged", action="store_true", help="禁用内容指纹比对，每次全部 upsert")
     parser.add_argument("--http-timeout", type=int, default=30, help="HTTP 请求超时时间")
+    parser.add_argument("--cache-dir", type=Path, help="详情页磁盘缓存目录：只保存 ETag/Last-Modified 与解析结果，不保存页面正文（条件请求 / 304 复用）")
+    parser.add_argument("--cache-max-mb", type=int, default=200, help="详情页缓存容量上限（MB，LRU 淘汰）")
+    parser.add_argument("--max-retries", type=int, default=4, help="单个请求遇到 429/5xx/网络错误时的最大重试次数")
+    parser.add_argument("--error-budget", type=int, default=100, help="整次运行允许的重试总数，超出后终止")
     return parser.parse_args()
 
 
+def _raise_keyboard_interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
 def main() -> None:
     args = parse_args()
     syncer = AcademicTransferPhDSync(
         max_pages=args.max_pages,
+        link_source=args.link_source,
         max_jobs=args.max_jobs,
         delay=args.delay,
         detail_delay=args.detail_delay,
+        fetch_workers=args.fetch_workers,
+        parse_workers=args.parse_workers,
+        translate_workers=args.translate_workers,
+        queue_size=args.queue_size,
         headless=not args.no_headless,
+        block_resources=args.block_resources,
         dry_run=args.dry_run,
         enable_translation=args.enable_translation,
         output_path=args.output,
@@ -968,8 +1600,26 @@ def main() -> None:
         supabase_table=args.supabase_table,
         supabase_batch_size=args.supabase_batch_size,
         http_timeout=args.http_timeout,
+        max_retries=args.max_retries,
+        error_budget=args.error_budget,
+        cache_dir=args.cache_dir,
+        cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+        hash_index_path=args.hash_index,
+        skip_unchanged=not args.no_skip_unchanged,
+        translation_db=args.translation_db,
+        translation_batch_chars=args.translation_batch_chars,
+        parser_backend=args.parser,
     )
-    syncer.run()
+    # SIGTERM 与 SIGINT 一样走异常路径，确保流式写入的缓冲区被写出
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    try:
+        syncer.run()
+    except KeyboardInterrupt:
+        logging.warning("收到中断信号，已写出缓冲区中的记录，退出。")
+        raise SystemExit(130)
+    except ErrorBudgetExhausted as exc:
+        logging.error("重试预算耗尽，终止同步：%s", exc)
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
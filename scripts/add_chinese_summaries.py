@@ -11,6 +11,21 @@ The script reads an existing JSON file (same structure as produced by
 `academictransfer_phd_sync.py`), translates selected English fields to
 Chinese via the public Google Translate endpoint, and writes a new JSON
 file with the `*_zh` fields populated.
+
+Progress is checkpointed atomically every `--checkpoint-items` items or
+`--checkpoint-seconds` seconds to `<output>.checkpoint.json`; `--resume`
+continues an interrupted run from there.
+
+With `--stream` the items are read incrementally (NDJSON input, or JSON via
+`ijson` when installed) and each enriched item is written straight out, so
+memory stays flat regardless of the dataset size. Top-level fields of a
+JSON input (`generated_at`, `failed`, ...) are kept in JSON output. NDJSON
+output in stream mode doubles as its own checkpoint: `--resume` skips the
+items whose `source_id` is already written.
+
+Translations go through a paragraph-level SQLite translation memory
+(`--translation-db`), so identical paragraphs are translated once and
+re-runs over mostly unchanged data only pay for the new text.
 """
 
 from __future__ import annotations
@@ -18,75 +33,94 @@ from __future__ import annotations
 import argparse
 import json
 import logging
-import math
 import sys
+import time
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import requests
 
-TRANSLATE_ENDPOINT = "https://translate.googleapis.com/translate_a/single"
+from rate_limiter import TokenBucket
+from record_io import (
+    JsonItemsWriter,
+    NdjsonWriter,
+    collect_written_keys,
+    is_ndjson_path,
+    iter_records,
+    read_json_metadata,
+    write_json_atomic,
+)
+from translation_memory import DEFAULT_DB_PATH, DEFAULT_MAX_CHARS, TranslationMemory, Translator
+
 DEFAULT_FIELDS = [
     ("description_en", "description_zh"),
     ("requirements_en", "requirements_zh"),
     ("application_steps_en", "application_steps_zh"),
 ]
+ITEM_WINDOW = 20
+DEFAULT_CHECKPOINT_ITEMS = 100
+DEFAULT_CHECKPOINT_SECONDS = 60.0
 
 
-def chunk_text(text: str, max_chars: int) -> Iterable[str]:
-    """Split long text into manageable chunks without breaking sentences."""
-    if len(text) <= max_chars:
-        yield text
+def translate_items(
+    items: List[Dict], fields: List[Tuple[str, str]], force: bool, translator: Translator
+) -> None:
+    """Fill the destination fields of a group of items with one batched lookup."""
+    pending = []
+    for item in items:
+        for src_field, dst_field in fields:
+            src_value = item.get(src_field, "")
+            if not src_value:
+                continue
+            if item.get(dst_field) and not force:
+                continue
+            pending.append((item, dst_field, src_value))
+    if not pending:
         return
+    translations = translator.translate_many([text for _, _, text in pending])
+    for (item, dst_field, _), translated in zip(pending, translations):
+        if translated:
+            item[dst_field] = translated
 
-    sentences = text.split("\n")
-    current = []
-    current_len = 0
-
-    for sentence in sentences:
-        segment = sentence.strip()
-        if not segment:
-            continue
-        segment_len = len(segment)
-        if current and current_len + segment_len + 1 > max_chars:
-            yield "\n".join(current)
-            current = [segment]
-            current_len = segment_len
-        else:
-            current.append(segment)
-            current_len += segment_len + (1 if current_len else 0)
-
-    if current:
-        yield "\n".join(current)
 
+def build_translator(
+    max_chars: int, translation_db: Optional[Path], workers: int, max_rps: float
+) -> Translator:
+    return Translator(
+        requests.Session(),
+        TranslationMemory(translation_db),
+        target_lang="zh-CN",
+        max_chars=max_chars,
+        workers=workers,
+        limiter=TokenBucket(max_rps) if max_rps > 0 else None,
+    )
 
-def translate_text(text: str, target_lang: str = "zh-CN", max_chars: int = 4000) -> str:
-    """Translate a possibly long text using Google Translate HTTP endpoint."""
-    if not text:
-        return ""
 
-    translated_chunks: List[str] = []
-    session = requests.Session()
+def checkpoint_path_for(output_path: Path) -> Path:
+    return output_path.with_name(output_path.name + ".checkpoint.json")
 
-    for chunk in chunk_text(text, max_chars):
-        payload = {
-            "client": "gtx",
-            "sl": "auto",
-            "tl": target_lang,
-            "dt": "t",
-            "q": chunk,
-        }
-        try:
-            resp = session.get(TRANSLATE_ENDPOINT, params=payload, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-            translated = "".join(segment[0] for segment in data[0])
-            translated_chunks.append(translated.strip())
-        except Exception as exc:
-            logging.warning("Translation failed (chunk starts with %r): %s", chunk[:40], exc)
-            translated_chunks.append("")
 
-    return "\n".join(filter(None, translated_chunks)).strip()
+def load_checkpoint(checkpoint_path: Path, input_path: Path) -> Optional[Tuple[Dict, int]]:
+    """Return (data, processed item count) from a checkpoint of the same input, if any."""
+    if not checkpoint_path.exists():
+        return None
+    try:
+        state = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as exc:
+        logging.warning("Ignoring unreadable checkpoint %s: %s", checkpoint_path, exc)
+        return None
+    if not isinstance(state, dict):
+        logging.warning("Ignoring malformed checkpoint %s", checkpoint_path)
+        return None
+    if state.get("input") != str(input_path):
+        logging.warning("Checkpoint %s belongs to %s, ignoring", checkpoint_path, state.get("input"))
+        return None
+    data, processed = state.get("data"), state.get("processed", 0)
+    if not isinstance(data, dict) or not isinstance(processed, int):
+        logging.warning("Ignoring malformed checkpoint %s", checkpoint_path)
+        return None
+    return data, processed
 
 
 def process_file(
@@ -95,29 +129,120 @@ def process_file(
     fields: List[Tuple[str, str]],
     force: bool,
     max_chars: int,
+    translation_db: Optional[Path] = DEFAULT_DB_PATH,
+    workers: int = 1,
+    max_rps: float = 0.0,
+    resume: bool = False,
+    checkpoint_items: int = DEFAULT_CHECKPOINT_ITEMS,
+    checkpoint_seconds: float = DEFAULT_CHECKPOINT_SECONDS,
+    stream: bool = False,
 ) -> None:
-    logging.info("Loading JSON: %s", input_path)
-    data = json.loads(input_path.read_text(encoding="utf-8"))
+    if stream:
+        translator = build_translator(max_chars, translation_db, workers, max_rps)
+        try:
+            stream_file(input_path, output_path, fields, force, translator, resume)
+        finally:
+            translator.close()
+        logging.info("%s", translator.stats_line())
+        return
+
+    checkpoint_path = checkpoint_path_for(output_path)
+    restored = load_checkpoint(checkpoint_path, input_path) if resume else None
+    if restored:
+        data, processed = restored
+        logging.info("Resuming from checkpoint %s (%s items done)", checkpoint_path, processed)
+    else:
+        logging.info("Loading JSON: %s", input_path)
+        if is_ndjson_path(input_path):
+            data = {"items": list(iter_records(input_path))}
+        else:
+            data = json.loads(input_path.read_text(encoding="utf-8"))
+        processed = 0
     items = data.get("items", [])
     total = len(items)
     logging.info("Found %s items", total)
 
-    for idx, item in enumerate(items, start=1):
-        for src_field, dst_field in fields:
-            src_value = item.get(src_field, "")
-            dst_value = item.get(dst_field)
-            if not src_value:
-                continue
-            if dst_value and not force:
-                continue
-            translated = translate_text(src_value, target_lang="zh-CN", max_chars=max_chars)
-            if translated:
-                item[dst_field] = translated
-        if idx % 20 == 0 or idx == total:
-            logging.info("Processed %s/%s items", idx, total)
-
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    def save_checkpoint(done: int) -> None:
+        write_json_atomic(
+            checkpoint_path, {"input": str(input_path), "processed": done, "data": data}, indent=None
+        )
+        logging.info("Checkpoint written: %s/%s items", done, total)
+
+    translator = build_translator(max_chars, translation_db, workers, max_rps)
+    # Items are grouped in fixed-size windows independent of `workers`, so the
+    # requests (and therefore the output) are the same in serial and parallel mode.
+    done = processed
+    last_items, last_time = processed, time.monotonic()
+    try:
+        for start in range(processed, total, ITEM_WINDOW):
+            translate_items(items[start:start + ITEM_WINDOW], fields, force, translator)
+            done = min(start + ITEM_WINDOW, total)
+            logging.info("Processed %s/%s items", done, total)
+            if done < total and (
+                done - last_items >= checkpoint_items
+                or time.monotonic() - last_time >= checkpoint_seconds
+            ):
+                save_checkpoint(done)
+                last_items, last_time = done, time.monotonic()
+    except KeyboardInterrupt:
+        if done > last_items:
+            save_checkpoint(done)
+        raise
+    finally:
+        translator.close()
+    logging.info("%s", translator.stats_line())
+
+    write_json_atomic(output_path, data)
+    logging.info("Written output: %s", output_path)
+    if checkpoint_path.exists():
+        checkpoint_path.unlink()
+
+
+def record_key(record: Dict) -> Optional[str]:
+    """Identity of an item across runs, used to resume stream mode; items without one are always rewritten."""
+    value = record.get("source_id") or record.get("official_link")
+    return str(value) if value else None
+
+
+def stream_file(
+    input_path: Path,
+    output_path: Path,
+    fields: List[Tuple[str, str]],
+    force: bool,
+    translator: Translator,
+    resume: bool = False,
+) -> None:
+    """Translate items window by window without holding the dataset in memory."""
+    metadata = read_json_metadata(input_path)
+    records = iter_records(input_path)
+    if is_ndjson_path(output_path):
+        extra = sorted(set(metadata) - {"total"})
+        if extra:
+            raise ValueError(
+                f"{input_path} has top-level fields ({', '.join(extra)}) "
+                "that NDJSON output cannot keep; stream to a .json output instead"
+            )
+        writer = NdjsonWriter(output_path, truncate=not resume)
+        done = collect_written_keys(output_path, record_key) if resume else set()
+        if done:
+            # Resume by item identity, not by line count: a malformed input
+            # line that was skipped must not shift the remaining items.
+            logging.info("Resuming: %s items already in %s", len(done), output_path)
+            records = (record for record in records if record_key(record) not in done)
+    else:
+        if resume:
+            logging.warning("--resume in stream mode needs NDJSON output; starting over")
+        writer = JsonItemsWriter(output_path, metadata)
+
+    with writer:
+        while True:
+            window = list(islice(records, ITEM_WINDOW))
+            if not window:
+                break
+            translate_items(window, fields, force, translator)
+            for item in window:
+                writer.write(item)
+            logging.info("Processed %s items", writer.count)
     logging.info("Written output: %s", output_path)
 
 
@@ -135,8 +260,8 @@ def parse_fields(field_args: List[str]) -> List[Tuple[str, str]]:
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Add Chinese summaries to scraped data")
-    parser.add_argument("--input", required=True, type=Path, help="Input JSON file path")
-    parser.add_argument("--output", required=True, type=Path, help="Output JSON file path")
+    parser.add_argument("--input", required=True, type=Path, help="Input JSON (or .ndjson) file path")
+    parser.add_argument("--output", required=True, type=Path, help="Output JSON (or .ndjson) file path")
     parser.add_argument(
         "--field",
         action="append",
@@ -151,8 +276,48 @@ def main() -> int:
     parser.add_argument(
         "--max-chars",
         type=int,
-        default=4000,
-        help="Maximum characters per translation chunk (default: 4000)",
+        default=DEFAULT_MAX_CHARS,
+        help=f"Maximum characters per translation request (default: {DEFAULT_MAX_CHARS})",
+    )
+    parser.add_argument(
+        "--translation-db",
+        type=Path,
+        default=DEFAULT_DB_PATH,
+        help=f"SQLite translation memory shared across runs (default: {DEFAULT_DB_PATH})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Concurrent translation requests (default: 1; output is identical for any value)",
+    )
+    parser.add_argument(
+        "--max-rps",
+        type=float,
+        default=5.0,
+        help="Maximum translation requests per second shared by all workers (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from <output>.checkpoint.json left by an interrupted run",
+    )
+    parser.add_argument(
+        "--checkpoint-items",
+        type=int,
+        default=DEFAULT_CHECKPOINT_ITEMS,
+        help=f"Write a checkpoint every N items (default: {DEFAULT_CHECKPOINT_ITEMS})",
+    )
+    parser.add_argument(
+        "--checkpoint-seconds",
+        type=float,
+        default=DEFAULT_CHECKPOINT_SECONDS,
+        help=f"Write a checkpoint at least every T seconds (default: {DEFAULT_CHECKPOINT_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read items incrementally and write each one straight out (flat memory use)",
     )
     parser.add_argument("--log-level", default="INFO", help="Logging level (default: INFO)")
 
@@ -161,7 +326,20 @@ def main() -> int:
 
     try:
         fields = parse_fields(args.field)
-        process_file(args.input, args.output, fields, args.force, args.max_chars)
+        process_file(
+            args.input,
+            args.output,
+            fields,
+            args.force,
+            args.max_chars,
+            args.translation_db,
+            args.workers,
+            args.max_rps,
+            resume=args.resume,
+            checkpoint_items=args.checkpoint_items,
+            checkpoint_seconds=args.checkpoint_seconds,
+            stream=args.stream,
+        )
     except Exception as exc:
         logging.error("Failed to add Chinese summaries: %s", exc)
         return 1
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark AcademicTransfer detail-page parsing over saved HTML pages.
+
+Times `JobDetailParser.parse` over the committed AcademicTransfer fixtures
+(`scripts/fixtures/academictransfer`, or another directory via `--fixtures`)
+and prints per-page latency. With `--baseline` the same pages are also parsed
+by the `JobDetailParser` of another copy of `academictransfer_phd_sync.py`
+(for example an older revision), the two timings are compared and the
+extracted records are checked for equality.
+
+Usage example:
+    git show HEAD~1:scripts/academictransfer_phd_sync.py > /tmp/phd_sync_old.py
+    python3 scripts/benchmark_job_detail_parser.py --baseline /tmp/phd_sync_old.py
+
+Fixtures are loaded (and job URLs rebuilt from their file names) by
+`parser_fixtures.load_fixtures`, the same loader the other parse tools use.
+
+Against the revision before the section classifier was precompiled
+(917d825), the committed fixtures parse 1.0-1.2x faster (three runs of
+`--repeat 50`, records identical); at ~2.5ms per page the difference is
+close to run-to-run noise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any, List, Optional, Tuple
+
+from benchmark_utils import latency_stats, time_pages
+from parser_fixtures import DEFAULT_FIXTURES_ROOT, TARGETS, load_fixtures, to_jsonable
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+def load_module(path: Path, name: str) -> ModuleType:
+    sys.path.insert(0, str(SCRIPT_DIR))  # sibling imports (http_session, ...)
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module  # dataclasses resolve annotations through sys.modules
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_parser(parser, pages: List[Tuple[str, str]], repeat: int) -> Tuple[List[float], float, List[Any]]:
+    """Return per-page latencies, total seconds and the comparable records of the last pass."""
+    for url, html in pages:  # untimed warm-up pass (imports, regex and soup builder caches)
+        parser.parse(url, html)
+    latencies, elapsed, records = time_pages(parser.parse, pages, repeat)
+    return latencies, elapsed, [to_jsonable(record) for record in records]
+
+
+def summarize(label: str, latencies: List[float], elapsed: float) -> float:
+    stats = latency_stats(latencies, elapsed)
+    print(
+        f"{label:<10} pages={len(latencies):<6} mean={stats['mean_ms']:8.2f}ms "
+        f"p50={stats['p50_ms']:8.2f}ms p95={stats['p95_ms']:8.2f}ms pages/sec={stats['pages_per_sec']:8.1f}"
+    )
+    return stats["mean_ms"]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark AcademicTransfer detail-page parsing")
+    parser.add_argument(
+        "--fixtures",
+        type=Path,
+        default=DEFAULT_FIXTURES_ROOT / "academictransfer",
+        help="Directory with saved detail pages (*.html; default: the committed fixtures)",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="Another academictransfer_phd_sync.py to compare against (timing and output)",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the fixtures (default: 20)")
+    args = parser.parse_args(argv)
+
+    pages = load_fixtures(TARGETS["academictransfer"], args.fixtures)
+    print(f"{len(pages)} fixtures x {args.repeat} passes")
+
+    current = load_module(SCRIPT_DIR / "academictransfer_phd_sync.py", "phd_sync_current")
+    current_latencies, current_elapsed, current_records = time_parser(current.JobDetailParser(), pages, args.repeat)
+
+    if not args.baseline:
+        summarize("current", current_latencies, current_elapsed)
+        return 0
+
+    baseline = load_module(args.baseline, "phd_sync_baseline")
+    baseline_latencies, baseline_elapsed, baseline_records = time_parser(baseline.JobDetailParser(), pages, args.repeat)
+    before = summarize("baseline", baseline_latencies, baseline_elapsed)
+    after = summarize("current", current_latencies, current_elapsed)
+    print(f"speedup    {before / after:.2f}x" if after else "speedup    n/a")
+
+    mismatches = [
+        url
+        for (url, _), old, new in zip(pages, baseline_records, current_records)
+        if old != new
+    ]
+    for url in mismatches:
+        print(f"MISMATCH   {url}")
+    print(f"records    {len(pages) - len(mismatches)}/{len(pages)} identical")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Offline parse benchmark for all scrapers, replaying saved HTML fixtures.
+
+Each (target, parser backend) pair from `parser_fixtures.TARGETS` runs in its
+own subprocess, so peak RSS is measured per parser and one target's imports
+or caches do not skew another's numbers. No browser and no network are
+needed. Fixtures are looked up as `<fixtures-root>/<target>/*.html` (default:
+the pages committed under `scripts/fixtures`); targets without a fixture
+directory are skipped. To A/B two revisions of the AcademicTransfer parser
+rather than two backends, use `benchmark_job_detail_parser.py`.
+
+Reported per run: pages/sec, p50/p95 latency per page, and peak RSS of the
+worker process (plus how much parsing added on top of the interpreter and
+imports). `--output-json` stores the results; a later run with `--compare`
+fails (exit 1) when a p50 regressed by more than `--max-regression`.
+
+Usage example:
+    python3 scripts/benchmark_parsers.py --output-json tmp/parse_bench.json
+    python3 scripts/benchmark_parsers.py --compare tmp/parse_bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmark_utils import latency_stats, peak_rss_mb, time_pages
+from html_parsers import available_parsers
+from parser_fixtures import DEFAULT_FIXTURES_ROOT, TARGETS, load_fixtures
+
+SCRIPT_PATH = Path(__file__).resolve()
+
+
+def run_worker(target_name: str, fixtures: Path, backend: str, repeat: int, warmup: int) -> Dict:
+    """Parse the fixtures in this process and return the measurements."""
+    target = TARGETS[target_name]
+    pages = load_fixtures(target, fixtures)
+    parse = target.factory(backend)
+    for url, html in pages[:warmup]:
+        parse(url, html)
+    rss_before = peak_rss_mb()
+    latencies, elapsed, _ = time_pages(parse, pages, repeat)
+    return {
+        "target": target_name,
+        "parser": backend,
+        "pages": len(pages),
+        "parses": len(latencies),
+        **latency_stats(latencies, elapsed),
+        "peak_rss_mb": peak_rss_mb(),
+        "parse_rss_mb": peak_rss_mb() - rss_before,
+    }
+
+
+def spawn_worker(target_name: str, fixtures: Path, backend: str, repeat: int, warmup: int) -> Optional[Dict]:
+    cmd = [
+        sys.executable,
+        str(SCRIPT_PATH),
+        "--worker",
+        "--targets", target_name,
+        "--fixtures-root", str(fixtures.parent),
+        "--parsers", backend,
+        "--repeat", str(repeat),
+        "--warmup", str(warmup),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(f"{target_name}/{backend} failed:\n{proc.stderr.strip()}", file=sys.stderr)
+        return None
+    # Scrapers may log to stdout while parsing; the result is the last line.
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def print_result(result: Dict) -> None:
+    print(
+        f"{result['target']:<22} {result['parser']:<12} pages={result['pages']:<5} "
+        f"pages/sec={result['pages_per_sec']:8.1f} p50={result['p50_ms']:8.2f}ms "
+        f"p95={result['p95_ms']:8.2f}ms peak_rss={result['peak_rss_mb']:7.1f}MB "
+        f"(+{result['parse_rss_mb']:.1f}MB parsing)"
+    )
+
+
+def compare(results: List[Dict], baseline_path: Path, max_regression: float) -> int:
+    baseline = {
+        (entry["target"], entry["parser"]): entry
+        for entry in json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    }
+    regressions = 0
+    for result in results:
+        old = baseline.get((result["target"], result["parser"]))
+        if not old or not old["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / old["p50_ms"]
+        flag = "REGRESSION" if ratio > 1 + max_regression else "ok"
+        regressions += flag != "ok"
+        print(
+            f"{flag:<10} {result['target']:<22} {result['parser']:<12} "
+            f"p50 {old['p50_ms']:.2f}ms -> {result['p50_ms']:.2f}ms ({ratio:.2f}x)"
+        )
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark scraper HTML parsing over saved fixtures")
+    parser.add_argument(
+        "--fixtures-root",
+        type=Path,
+        default=DEFAULT_FIXTURES_ROOT,
+        help="Directory containing one sub-directory of *.html per target (default: the committed scripts/fixtures)",
+    )
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), help="Targets to run (default: all found)")
+    parser.add_argument("--parsers", nargs="+", help="Parser backends to run (default: all installed)")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the fixtures (default: 3)")
+    parser.add_argument("--warmup", type=int, default=3, help="Pages parsed before timing starts (default: 3)")
+    parser.add_argument("--output-json", type=Path, help="Write the results to this file")
+    parser.add_argument("--compare", type=Path, help="Results file of an earlier run to compare p50 against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Allowed p50 slowdown vs --compare before failing (default: 0.2 = 20%%)",
+    )
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    backends = args.parsers or available_parsers()
+    targets = args.targets or sorted(TARGETS)
+
+    if args.worker:
+        result = run_worker(targets[0], args.fixtures_root / targets[0], backends[0], args.repeat, args.warmup)
+        print(json.dumps(result))
+        return 0
+
+    results: List[Dict] = []
+    failures = 0
+    for target_name in targets:
+        fixtures = args.fixtures_root / target_name
+        if not fixtures.is_dir():
+            if args.targets:
+                print(f"{target_name}: no fixtures in {fixtures}", file=sys.stderr)
+            continue
+        for backend in backends:
+            result = spawn_worker(target_name, fixtures, backend, args.repeat, args.warmup)
+            if result is None:
+                failures += 1
+                continue
+            print_result(result)
+            results.append(result)
+
+    if not results:
+        print(f"Nothing benchmarked (no fixtures under {args.fixtures_root})", file=sys.stderr)
+        return 1
+    if args.output_json:
+        args.output_json.parent.mkdir(parents=True, exist_ok=True)
+        args.output_json.write_text(
+            json.dumps({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, indent=2),
+            encoding="utf-8",
+        )
+    status = compare(results, args.compare, args.max_regression) if args.compare else 0
+    return 1 if failures else status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
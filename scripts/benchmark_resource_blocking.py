@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Live benchmark of the `resource_blocking` profiles on the scrapers' sites.
+
+For every (site, profile) pair a fresh headless Chrome is launched with the
+profile applied the way the scraper's driver for that page applies it, the
+browser cache is disabled, and the page is loaded `--repeat` times. The
+Compass and NUS ECE listing drivers may need a human to solve a captcha and
+therefore use only the CDP layer (no launch-time image prefs); their sites
+are measured in that CDP-only mode, the others with prefs + CDP. `--url`
+pages use prefs + CDP unless `--cdp-only` is given. Chrome's performance log
+supplies the network events, from which the benchmark reports:
+
+- bytes transferred (sum of `encodedDataLength` of finished requests),
+- requests finished and requests blocked,
+- load time: `loadEventEnd` of the navigation timing entry, plus the wall
+  time `driver.get` took.
+
+Needs Chrome, chromedriver and network access; results depend on the sites'
+current content, so compare profiles from the same run.
+
+Usage example:
+    python3 scripts/benchmark_resource_blocking.py --sites compass nus-ece --repeat 3
+    python3 scripts/benchmark_resource_blocking.py --url https://example.org/ --profiles none full
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+import compass_offer_scraper
+import nus_ece_professor_scraper
+from academictransfer_phd_sync import LIST_URL as ACADEMICTRANSFER_LIST_URL
+from resource_blocking import BLOCK_PROFILES, configure_options, enable_blocking
+
+# site -> (url, launch-time prefs applied by the scraper's driver for this page)
+SITES: Dict[str, Tuple[str, bool]] = {
+    "academictransfer": (ACADEMICTRANSFER_LIST_URL, True),
+    "compass": (compass_offer_scraper.LISTING_URL, False),
+    "nus-ece": (nus_ece_professor_scraper.LISTING_URL, False),
+    "nus-computing": ("https://www.comp.nus.edu.sg/about/faculty/", True),
+}
+
+_NAVIGATION_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+return nav ? [nav.domContentLoadedEventEnd, nav.loadEventEnd] : [0, 0];
+"""
+
+
+def create_driver(profile: str, launch_prefs: bool = True) -> webdriver.Chrome:
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1280,720")
+    options.add_argument(f"user-agent={nus_ece_professor_scraper.USER_AGENT}")
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if launch_prefs:
+        configure_options(options, profile)
+    driver = webdriver.Chrome(options=options)
+    enable_blocking(driver, profile)
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+    return driver
+
+
+def network_totals(driver: webdriver.Chrome) -> Dict[str, int]:
+    """Drain the performance log and sum the network events since the last call."""
+    totals = {"bytes": 0, "requests": 0, "blocked": 0}
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.loadingFinished":
+            totals["bytes"] += int(params.get("encodedDataLength", 0))
+            totals["requests"] += 1
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            totals["blocked"] += 1
+    return totals
+
+
+def measure(site: str, url: str, profile: str, repeat: int, launch_prefs: bool = True) -> Optional[Dict]:
+    try:
+        driver = create_driver(profile, launch_prefs)
+    except WebDriverException as exc:
+        print(f"{site}/{profile}: cannot start Chrome: {exc}", file=sys.stderr)
+        return None
+    loads: List[Dict] = []
+    try:
+        for _ in range(repeat):
+            driver.get("about:blank")
+            network_totals(driver)  # discard events of the previous load
+            start = time.perf_counter()
+            driver.get(url)  # returns once the load event has fired
+            wall_ms = (time.perf_counter() - start) * 1000
+            dcl_ms, load_ms = driver.execute_script(_NAVIGATION_JS)
+            loads.append({"wall_ms": wall_ms, "dcl_ms": dcl_ms, "load_ms": load_ms, **network_totals(driver)})
+    except WebDriverException as exc:
+        print(f"{site}/{profile}: {exc}", file=sys.stderr)
+    finally:
+        driver.quit()
+    if not loads:
+        return None
+
+    def median(key: str) -> float:
+        return statistics.median(load[key] for load in loads)
+
+    return {
+        "site": site,
+        "url": url,
+        "profile": profile,
+        "mode": "prefs+cdp" if launch_prefs else "cdp-only",
+        "loads": len(loads),
+        "bytes": median("bytes"),
+        "requests": median("requests"),
+        "blocked": median("blocked"),
+        "dcl_ms": median("dcl_ms"),
+        "load_ms": median("load_ms"),
+        "wall_ms": median("wall_ms"),
+    }
+
+
+def print_result(result: Dict, baseline: Optional[Dict]) -> None:
+    saved = ""
+    if baseline and baseline is not result and baseline["bytes"] and baseline["load_ms"]:
+        bytes_saved = 1 - result["bytes"] / baseline["bytes"]
+        time_saved = 1 - result["load_ms"] / baseline["load_ms"]
+        saved = f"  (saved {bytes_saved:.0%} bytes, {time_saved:.0%} load time vs {baseline['profile']})"
+    print(
+        f"{result['site']:<17} {result['profile']:<6} {result['mode']:<9} {result['bytes'] / 1024:9.1f} KB "
+        f"requests={result['requests']:<5.0f} blocked={result['blocked']:<5.0f} "
+        f"DOMContentLoaded={result['dcl_ms']:7.0f}ms load={result['load_ms']:7.0f}ms "
+        f"get()={result['wall_ms']:7.0f}ms{saved}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure bytes and load time per resource-blocking profile")
+    parser.add_argument("--sites", nargs="+", choices=sorted(SITES), help="Scraper sites to load (default: all)")
+    parser.add_argument("--url", action="append", default=[], help="Extra URL to load (repeatable)")
+    parser.add_argument(
+        "--cdp-only",
+        action="store_true",
+        help="Measure --url pages without the launch-time prefs, like a captcha-capable listing driver",
+    )
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        choices=list(BLOCK_PROFILES),
+        default=list(BLOCK_PROFILES),
+        help="Profiles to compare; the first one is the baseline (default: all)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Loads per site and profile; medians are reported (default: 3)")
+    parser.add_argument("--output-json", type=Path, help="Write the results to this file")
+    args = parser.parse_args(argv)
+
+    pages = {name: SITES[name] for name in (args.sites or sorted(SITES))}
+    pages.update({url: (url, not args.cdp_only) for url in args.url})
+
+    results: List[Dict] = []
+    for site, (url, launch_prefs) in pages.items():
+        baseline: Optional[Dict] = None
+        for profile in args.profiles:
+            result = measure(site, url, profile, args.repeat, launch_prefs)
+            if result is None:
+                continue
+            baseline = baseline or result
+            print_result(result, baseline)
+            results.append(result)
+
+    if not results:
+        print("Nothing measured", file=sys.stderr)
+        return 1
+    if args.output_json:
+        args.output_json.parent.mkdir(parents=True, exist_ok=True)
+        args.output_json.write_text(
+            json.dumps({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, indent=2),
+            encoding="utf-8",
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
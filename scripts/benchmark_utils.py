@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Timing helpers shared by the offline parse benchmarks.
+
+`benchmark_parsers.py` (every target x parser backend, one subprocess each)
+and `benchmark_job_detail_parser.py` (current vs. another revision of the
+AcademicTransfer parser) both replay `parser_fixtures` pages through a parse
+function; this module holds the timing loop and the statistics they report.
+"""
+
+from __future__ import annotations
+
+import resource
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def time_pages(
+    parse: Callable[[str, str], Any], pages: List[Tuple[str, str]], repeat: int
+) -> Tuple[List[float], float, List[Any]]:
+    """Parse every page `repeat` times; return per-page latencies, total seconds and the last pass's results."""
+    latencies: List[float] = []
+    results: List[Any] = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        results = []
+        for url, html in pages:
+            start = time.perf_counter()
+            results.append(parse(url, html))
+            latencies.append(time.perf_counter() - start)
+    return latencies, time.perf_counter() - started, results
+
+
+def latency_stats(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    return {
+        "pages_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
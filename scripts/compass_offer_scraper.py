@@ -40,12 +40,22 @@ from selenium import webdriver
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+
+from driver_pool import DriverPool
+from html_parsers import DEFAULT_PARSER, PARSER_BACKENDS, check_parser, make_soup
+from resource_blocking import BLOCK_PROFILES, DEFAULT_BLOCK_PROFILE, configure_options, disable_blocking, enable_blocking
+from wait_strategies import DEFAULT_SETTLE_TIMEOUT, PageWaiter
 
 BASE_URL = "https://www.compassedu.hk"
 LISTING_URL = "https://www.compassedu.hk/offer"
 REQUEST_DELAY = 1.5  # 请求间隔，礼貌对待服务器
+# 页面就绪条件（替代固定 sleep）：列表页出现 offer 链接（或验证码）即可读取
+LISTING_LINK_SELECTOR = "a[href*='newst_']"
+LISTING_READY_SELECTOR = f"{LISTING_LINK_SELECTOR}, .h-captcha, iframe[src*='hcaptcha']"
+LISTING_HREFS_JS = f"return Array.from(document.querySelectorAll(\"{LISTING_LINK_SELECTOR}\"), a => a.href);"
+# 详情页：出现"录取详情"区块即可读取（解析也以该区块为准），再等字段请求结束，最多 DETAIL_IDLE_TIMEOUT 秒
+DETAIL_READY_JS = "return !!document.body && document.body.textContent.indexOf('录取详情') !== -1;"
+DETAIL_IDLE_TIMEOUT = 3.0
 
 
 @dataclass
@@ -64,19 +74,41 @@ class OfferRecord:
 class CompassOfferScraper:
     """指南者留学Offer爬虫类"""
     
-    def __init__(self, max_workers: int = 3, headless: bool = False) -> None:
+    def __init__(
+        self,
+        max_workers: int = 3,
+        headless: bool = False,
+        parser_backend: str = DEFAULT_PARSER,
+        driver_max_pages: int = 50,
+        block_resources: str = DEFAULT_BLOCK_PROFILE,
+    ) -> None:
         """
         初始化爬虫
         
         Args:
             max_workers: 并发线程数
             headless: 是否使用无头模式
+            parser_backend: HTML 解析后端（html.parser / lxml）
+            driver_max_pages: 每个详情页 driver 处理多少页后重启（0 表示不重启）
+            block_resources: 资源屏蔽档位（none / media / lean / full），只读 page_source 无需图片、字体等
         """
         self.max_workers = max_workers
         self.headless = headless
-        self.driver = self._create_driver()
-        self.wait = WebDriverWait(self.driver, 30)
+        self.parser_backend = check_parser(parser_backend)
+        self.block_resources = block_resources
+        self._driver: Optional[webdriver.Chrome] = None  # 首次使用时才启动浏览器，离线解析无需 Chrome
+        self._listing_blocked = False  # 主 driver 是否启用了 CDP 资源屏蔽
         self.results_lock = Lock()  # 线程锁，保护结果列表
+        # 详情页工作线程各自复用一个 driver，而不是每个offer启动一次 Chrome
+        self.driver_pool = DriverPool(self._create_worker_driver, max_pages=driver_max_pages)
+        self.waiter = PageWaiter(timeout=15)
+
+    @property
+    def driver(self) -> webdriver.Chrome:
+        """列表页使用的主 WebDriver（延迟创建）"""
+        if self._driver is None:
+            self._driver = self._create_driver()
+        return self._driver
 
     def _create_driver(self) -> webdriver.Chrome:
         """创建Chrome WebDriver"""
@@ -93,10 +125,13 @@ class CompassOfferScraper:
         )
         chrome_options.add_argument("--window-size=1280,720")
         try:
-            return webdriver.Chrome(options=chrome_options)
+            driver = webdriver.Chrome(options=chrome_options)
         except WebDriverException as exc:
             logging.error("无法初始化 Chrome WebDriver，请确认已安装驱动: %s", exc)
             raise
+        # 列表页可能需要人工过验证码，只用可随时撤销的 CDP 屏蔽，不设置启动时的图片禁用
+        self._listing_blocked = enable_blocking(driver, self.block_resources)
+        return driver
 
     def _create_worker_driver(self) -> webdriver.Chrome:
         """为工作线程创建独立的WebDriver"""
@@ -112,7 +147,10 @@ class CompassOfferScraper:
             "Chrome/119.0.0.0 Safari/537.36"
         )
         chrome_options.add_argument("--window-size=1280,720")
-        return webdriver.Chrome(options=chrome_options)
+        configure_options(chrome_options, self.block_resources)
+        driver = webdriver.Chrome(options=chrome_options)
+        enable_blocking(driver, self.block_resources)
+        return driver
 
     def extract_offer_links(self, html: str) -> Set[str]:
         """
@@ -124,7 +162,7 @@ class CompassOfferScraper:
         Returns:
             offer详情页URL集合
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html, self.parser_backend)
         links: Set[str] = set()
         
         # 查找所有指向offer详情页的链接
@@ -262,7 +300,7 @@ class CompassOfferScraper:
         Returns:
             OfferRecord对象，如果解析失败则返回None
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html, self.parser_backend)
         
         # 移除script和style标签，减少干扰
         for script in soup(["script", "style", "noscript"]):
@@ -313,7 +351,7 @@ class CompassOfferScraper:
                 )
                 if exp_match:
                     exp_html = exp_match.group(1)
-                    exp_soup = BeautifulSoup(exp_html, "html.parser")
+                    exp_soup = make_soup(exp_html, self.parser_backend)
                     # 移除script和style标签
                     for script in exp_soup(["script", "style"]):
                         script.decompose()
@@ -351,22 +389,53 @@ class CompassOfferScraper:
         Returns:
             OfferRecord对象，如果失败则返回None
         """
-        driver = self._create_worker_driver()
-        try:
-            logging.debug("加载详情页: %s", url)
-            driver.get(url)
-            WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(2)  # 等待页面完全加载
-            html = driver.page_source
+        for attempt in range(2):  # 浏览器崩溃时换一个新 driver 重试一次
+            driver = None
+            try:
+                driver = self.driver_pool.acquire()
+                logging.debug("加载详情页: %s", url)
+                driver.get(url)
+                if not self.waiter.for_condition(lambda: driver.execute_script(DETAIL_READY_JS), label="detail"):
+                    logging.warning("详情页未出现录取详情区块，按当前内容解析: %s", url)
+                # 轮播图等动画会一直修改 DOM，这里改等网络空闲，并限制最长等待时间
+                self.waiter.for_network_idle(driver, label="detail-idle", timeout=DETAIL_IDLE_TIMEOUT)
+                html = driver.page_source
+            except TimeoutException:
+                logging.error("加载详情页超时: %s", url)
+                self.driver_pool.release()
+                return None
+            except WebDriverException as exc:
+                if driver is not None and self.driver_pool.is_alive(driver):
+                    logging.error("加载详情页失败 %s: %s", url, exc)
+                    self.driver_pool.release()
+                    return None
+                self.driver_pool.discard()
+                if attempt == 0:
+                    logging.warning("详情页浏览器已崩溃，重启后重试 %s: %s", url, exc)
+                    continue
+                logging.error("加载详情页失败（重启浏览器后仍失败）%s: %s", url, exc)
+                return None
+            self.driver_pool.release()
             return self._parse_detail_html(url, html)
-        except TimeoutException:
-            logging.error("加载详情页超时: %s", url)
-            return None
-        except WebDriverException as exc:
-            logging.error("加载详情页失败 %s: %s", url, exc)
-            return None
-        finally:
-            driver.quit()
+        return None
+
+    def _listing_hrefs(self) -> Set[str]:
+        """当前列表页上的 offer 链接（在浏览器内读取，避免每次轮询都解析整页）"""
+        return set(self.driver.execute_script(LISTING_HREFS_JS) or [])
+
+    def _scroll_and_settle(self) -> None:
+        """滚动到底部触发懒加载，等待 DOM 稳定后回到顶部"""
+        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        self.waiter.for_dom_settle(self.driver, label="scroll", timeout=DEFAULT_SETTLE_TIMEOUT)
+        self.driver.execute_script("window.scrollTo(0, 0);")
+
+    def _wait_for_new_listing(self, previous_hrefs: Set[str]) -> bool:
+        """翻页后等待列表中出现与翻页前不同的 offer 链接，再等待懒加载完成"""
+        changed = self.waiter.for_condition(
+            lambda: bool(self._listing_hrefs() - previous_hrefs), label="pagination"
+        )
+        self._scroll_and_settle()
+        return changed
 
     def _go_to_next_page(self, current_page: int, max_pages: int, previous_url: str) -> bool:
         """
@@ -387,6 +456,7 @@ class CompassOfferScraper:
             # 保存当前页面的第一个offer链接用于验证
             current_links = self.extract_offer_links(self.driver.page_source)
             first_link_on_current_page = list(current_links)[0] if current_links else None
+            hrefs_before = self._listing_hrefs()
             
             next_page = current_page + 1
             
@@ -394,7 +464,7 @@ class CompassOfferScraper:
             try:
                 # 先滚动到页面底部，确保分页器可见
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1)
+                self.waiter.for_dom_settle(self.driver, label="scroll", timeout=DEFAULT_SETTLE_TIMEOUT)
                 
                 # 查找包含下一个页码数字的链接（多种方式）
                 # 注意：实际URL格式是 /offer_p1, /offer_p2 等
@@ -447,20 +517,12 @@ class CompassOfferScraper:
                             href = page_link.get_attribute('href')
                             if href:
                                 logging.info("找到页码链接: %s (页码: %d)", href, next_page)
-                                # 滚动到可见位置
-                                self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", page_link)
-                                time.sleep(0.5)
+                                # 滚动到可见位置（非平滑滚动，无需等待动画）
+                                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", page_link)
                                 
-                                # 使用JavaScript点击（更可靠）
+                                # 使用JavaScript点击（更可靠），等待新一页的链接渲染
                                 self.driver.execute_script("arguments[0].click();", page_link)
-                                self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-                                time.sleep(3)  # 等待页面加载
-                                
-                                # 滚动页面确保内容加载
-                                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                                time.sleep(1)
-                                self.driver.execute_script("window.scrollTo(0, 0);")
-                                time.sleep(1)
+                                self._wait_for_new_listing(hrefs_before)
                                 
                                 # 验证页面是否真的变化了
                                 new_links = self.extract_offer_links(self.driver.page_source)
@@ -517,16 +579,9 @@ class CompassOfferScraper:
                 try:
                     logging.info("尝试URL跳转: %s", new_url)
                     self.driver.get(new_url)
-                    self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
                     
-                    # 等待页面完全加载（包括JavaScript渲染）
-                    time.sleep(3)
-                    
-                    # 滚动页面确保内容加载
-                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(1)
-                    self.driver.execute_script("window.scrollTo(0, 0);")
-                    time.sleep(1)
+                    # 等待JavaScript渲染出与翻页前不同的链接，并触发懒加载
+                    self._wait_for_new_listing(hrefs_before)
                     
                     # 验证页面是否真的变化了
                     new_links = self.extract_offer_links(self.driver.page_source)
@@ -593,15 +648,14 @@ class CompassOfferScraper:
                             # 检查按钮是否可点击（不是disabled）
                             button_class = next_button.get_attribute('class') or ''
                             if 'disabled' not in button_class.lower():
-                                self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", next_button)
-                                time.sleep(0.5)
+                                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
                                 
                                 # 保存点击前的URL
                                 url_before = self.driver.current_url
                                 
                                 # 点击按钮
                                 self.driver.execute_script("arguments[0].click();", next_button)
-                                time.sleep(3)  # 等待页面加载
+                                self._wait_for_new_listing(hrefs_before)
                                 
                                 # 验证页面是否真的变化了
                                 url_after = self.driver.current_url
@@ -638,19 +692,24 @@ class CompassOfferScraper:
         try:
             logging.info("加载offer列表页：%s (共%d页)", LISTING_URL, max_pages)
             self.driver.get(LISTING_URL)
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(3)  # 等待页面加载
+            self.waiter.ready(self.driver, LISTING_READY_SELECTOR, label="listing")
 
             # 检查是否有安全校验（如验证码）
             listing_html = self.driver.page_source
             if "h-captcha" in listing_html or "验证码" in listing_html:
                 logging.warning("检测到安全校验，请在浏览器中完成验证后按 Enter 继续。")
+                if self._listing_blocked:
+                    # 已被屏蔽的请求不会重试：解除屏蔽后重新加载，验证码组件才能完整显示
+                    disable_blocking(self.driver)
+                    self._listing_blocked = False
+                    self.driver.refresh()
+                    self.waiter.ready(self.driver, LISTING_READY_SELECTOR, label="listing")
                 try:
                     input("完成验证码后按 Enter 继续...")
                 except EOFError:
                     logging.error("无法等待用户输入，建议在本地非 headless 模式运行。")
                     return []
-                time.sleep(2)
+                self.waiter.ready(self.driver, LISTING_READY_SELECTOR, label="listing")
                 listing_html = self.driver.page_source
 
             # 循环遍历所有页面
@@ -660,10 +719,7 @@ class CompassOfferScraper:
                 logging.info("正在爬取第 %d/%d 页...", current_page, max_pages)
                 
                 # 滚动页面确保内容加载
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1)
-                self.driver.execute_script("window.scrollTo(0, 0);")
-                time.sleep(1)
+                self._scroll_and_settle()
                 
                 listing_html = self.driver.page_source
                 
@@ -733,6 +789,15 @@ class CompassOfferScraper:
                         time.sleep(REQUEST_DELAY)
 
             logging.info("成功爬取 %d 个offer记录", len(results))
+            logging.info(
+                "详情页浏览器统计：启动 %d 次，加载 %d 页，解析成功 %d 页（定期重启 %d 次，崩溃重启 %d 次）",
+                self.driver_pool.launches,
+                self.driver_pool.pages,
+                len(results),
+                self.driver_pool.recycled,
+                self.driver_pool.respawned,
+            )
+            logging.info("页面等待统计：%s", self.waiter.stats.summary())
             return results
             
         except TimeoutException:
@@ -742,8 +807,10 @@ class CompassOfferScraper:
             logging.error("列表页加载失败：%s", exc)
             return []
         finally:
+            self.driver_pool.close()
             try:
-                self.driver.quit()
+                if self._driver is not None:
+                    self._driver.quit()
             except Exception:
                 pass
 
@@ -847,6 +914,24 @@ def main() -> int:
         action="store_true",
         help="使用无头模式（不显示浏览器窗口）",
     )
+    parser.add_argument(
+        "--parser",
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER,
+        help="HTML解析后端（默认: html.parser；lxml 需安装 lxml 包）",
+    )
+    parser.add_argument(
+        "--driver-max-pages",
+        type=int,
+        default=50,
+        help="每个详情页浏览器处理多少页后重启以释放内存（默认: 50，0 表示不重启）",
+    )
+    parser.add_argument(
+        "--block-resources",
+        choices=list(BLOCK_PROFILES),
+        default=DEFAULT_BLOCK_PROFILE,
+        help="屏蔽不需要的资源以加快加载（默认: none；media=图片/字体/音视频，lean=再加统计脚本，full=再加CSS）",
+    )
     parser.add_argument(
         "--log-level",
         choices=["DEBUG", "INFO", "WARNING", "ERROR"],
@@ -864,7 +949,13 @@ def main() -> int:
     )
 
     try:
-        scraper = CompassOfferScraper(max_workers=args.max_workers, headless=args.headless)
+        scraper = CompassOfferScraper(
+            max_workers=args.max_workers,
+            headless=args.headless,
+            parser_backend=args.parser,
+            driver_max_pages=args.driver_max_pages,
+            block_resources=args.block_resources,
+        )
         records = scraper.scrape(max_offers=args.max_offers, max_pages=args.max_pages)
 
         if not records:
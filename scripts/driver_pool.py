@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Thread-affine pool of long-lived Selenium WebDrivers.
+
+Starting Chrome costs 1-3 s and ~150 MB, which dominated every detail page
+when the scrapers launched a fresh browser per URL. `DriverPool` keeps one
+driver per worker thread instead: a `ThreadPoolExecutor` with `max_workers`
+threads therefore runs at most `max_workers` browsers for the whole scrape.
+
+A thread's driver is health-checked before it is handed out and replaced
+if the browser has died, it is quit and relaunched after `max_pages` pages
+(Chrome's memory grows over long sessions), and callers can `discard` it
+when a page load fails in a way that suggests the browser crashed.
+
+The scrapers create the pool in `__init__` and share it across their
+executor's threads. `NUSProfessorScraper` leases the thread's driver per
+page:
+
+    self.driver_pool = DriverPool(self._create_driver, max_pages=driver_max_pages)
+    ...
+    with self.driver_pool.lease() as driver:  # in each executor task
+        prof = self.scrape_professor_detail(link_info, driver)
+    ...
+    self.driver_pool.close()  # after the executor, and again in close()
+    print(f"  {self.driver_pool.stats_line()}")
+
+`CompassOfferScraper.parse_detail_page` retries once on a fresh browser, so
+it pairs `acquire` with `release` (page done) or `discard` (browser died):
+
+    driver = self.driver_pool.acquire()
+    try:
+        driver.get(url)
+        html = driver.page_source
+    except WebDriverException:
+        if self.driver_pool.is_alive(driver):
+            self.driver_pool.release()
+            return None
+        self.driver_pool.discard()  # next acquire() launches a new driver
+        ...
+    self.driver_pool.release()
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+class _Slot:
+    __slots__ = ("driver", "pages")
+
+    def __init__(self, driver: WebDriver) -> None:
+        self.driver = driver
+        self.pages = 0
+
+
+class DriverPool:
+    """One WebDriver per thread, created lazily and reused until recycled or broken."""
+
+    def __init__(
+        self,
+        factory: Callable[[], WebDriver],
+        max_pages: int = 50,
+        health_check: bool = True,
+    ) -> None:
+        self.factory = factory
+        self.max_pages = max_pages  # 0 disables recycling
+        self.health_check = health_check
+        self._local = threading.local()
+        self._slots: Dict[int, _Slot] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.launches = 0
+        self.pages = 0
+        self.recycled = 0
+        self.respawned = 0
+
+    # ------------------------------------------------------------------ public
+
+    def acquire(self) -> WebDriver:
+        """Return the calling thread's driver, launching or replacing it if needed."""
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        slot: Optional[_Slot] = getattr(self._local, "slot", None)
+        if slot is not None and self.health_check and not self.is_alive(slot.driver):
+            logging.warning("WebDriver of %s is unresponsive, relaunching", threading.current_thread().name)
+            self._drop(slot)
+            slot = None
+            with self._lock:
+                self.respawned += 1
+        if slot is None:
+            slot = _Slot(self.factory())
+            self._local.slot = slot
+            with self._lock:
+                self._slots[id(slot)] = slot
+                self.launches += 1
+        return slot.driver
+
+    def release(self) -> None:
+        """Count a finished page for the calling thread's driver; recycle it after `max_pages`."""
+        slot: Optional[_Slot] = getattr(self._local, "slot", None)
+        if slot is None:
+            return
+        slot.pages += 1
+        with self._lock:
+            self.pages += 1
+        if self.max_pages and slot.pages >= self.max_pages:
+            self._drop(slot)
+            with self._lock:
+                self.recycled += 1
+
+    def discard(self) -> None:
+        """Quit the calling thread's driver (e.g. after a crash); the next acquire launches a new one."""
+        slot: Optional[_Slot] = getattr(self._local, "slot", None)
+        if slot is not None:
+            self._drop(slot)
+            with self._lock:
+                self.respawned += 1
+
+    @staticmethod
+    def is_alive(driver: WebDriver) -> bool:
+        """Cheap round trip to the browser; False once Chrome or chromedriver has died."""
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:  # WebDriverException, or urllib3 errors once chromedriver is gone
+            return False
+
+    @contextmanager
+    def lease(self) -> Iterator[WebDriver]:
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """Quit every driver in the pool; safe to call more than once."""
+        with self._lock:
+            self._closed = True
+            slots = list(self._slots.values())
+            self._slots.clear()
+        for slot in slots:
+            self._quit(slot.driver)
+
+    def stats_line(self) -> str:
+        per_launch = self.pages / self.launches if self.launches else 0.0
+        return (
+            f"drivers: {self.launches} launches for {self.pages} pages "
+            f"({per_launch:.1f} pages/launch, {self.recycled} recycled, {self.respawned} respawned)"
+        )
+
+    def __enter__(self) -> "DriverPool":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # ---------------------------------------------------------------- internal
+
+    def _drop(self, slot: _Slot) -> None:
+        self._local.slot = None
+        with self._lock:
+            self._slots.pop(id(slot), None)
+        self._quit(slot.driver)
+
+    @staticmethod
+    def _quit(driver: WebDriver) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Supabase REST API (PostgREST) for load tests.
+
+Implements the subset the writer scripts use, against in-memory tables:
+
+- GET / HEAD `/rest/v1/<table>` with `select=`, filters (`eq`, `neq`, `in`,
+  `is`, `gt`, `gte`, `lt`, `lte`), `order=`, `limit=`, `offset=`,
+  `Prefer: count=exact` (Content-Range) and single-object responses
+  (`Accept: application/vnd.pgrst.object+json`, used by `.single()`);
+- POST inserts, and upserts with `Prefer: resolution=merge-duplicates` or
+  `ignore-duplicates` on `on_conflict=` (default: the table's unique keys,
+  then `id`);
+- PATCH and DELETE with the same filters;
+- `Prefer: return=representation|minimal`.
+
+Every request can be delayed (`latency` + random `jitter`) and failed with
+probability `error_rate`, so batch sizes and concurrency can be compared
+without touching the production project. `GET /__stats` returns request
+counters. Tables are schemaless and created on first write; rows without an
+`id` get a UUID.
+
+Point a script at the fake by overriding its Supabase URL, e.g.:
+
+    python3 scripts/fake_postgrest.py --port 54321 --latency-ms 80 --error-rate 0.02 \
+        --seed programs=tmp/programs.json
+    VITE_SUPABASE_URL=http://127.0.0.1:54321 python3 clean_duplicates.py
+
+or in-process from a benchmark:
+
+    with FakePostgREST(latency=0.05) as server:
+        sync = AcademicTransferPhDSync(supabase_url=server.url, supabase_key="test", ...)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import signal
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+REST_PREFIX = "/rest/v1/"
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+SINGLE_OBJECT_MEDIA_TYPE = "application/vnd.pgrst.object+json"
+DEFAULT_UNIQUE_KEYS: Dict[str, Tuple[str, ...]] = {"phd_positions": ("source_id",)}
+
+Row = Dict[str, Any]
+
+
+class PostgrestError(Exception):
+    def __init__(self, status: int, code: str, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+# ---------------------------------------------------------------- filtering
+
+
+def _coerce(raw: str, value: Any) -> Any:
+    """Convert a filter literal to the type of the stored value for comparison."""
+    if isinstance(value, bool):
+        return raw.lower() == "true"
+    if isinstance(value, (int, float)):
+        try:
+            return type(value)(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _split_in_list(raw: str) -> List[str]:
+    """Parse the body of `in.(a,"b,c",d)` into its items."""
+    body = raw[1:-1] if raw.startswith("(") and raw.endswith(")") else raw
+    items: List[str] = []
+    current = ""
+    quoted = False
+    escaped = False
+    for char in body:
+        if escaped:
+            current += char
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif char == "," and not quoted:
+            items.append(current)
+            current = ""
+        else:
+            current += char
+    if body:
+        items.append(current)
+    return items
+
+
+def _make_filter(column: str, expression: str) -> Callable[[Row], bool]:
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+
+    def compare(row: Row) -> bool:
+        value = row.get(column)
+        if op == "is":
+            return value is {"null": None, "true": True, "false": False}.get(raw.lower(), raw)
+        if value is None:
+            return False
+        if op == "in":
+            return value in [_coerce(item, value) for item in _split_in_list(raw)]
+        target = _coerce(raw, value)
+        if op == "eq":
+            return value == target
+        if op == "neq":
+            return value != target
+        try:
+            if op == "gt":
+                return value > target
+            if op == "gte":
+                return value >= target
+            if op == "lt":
+                return value < target
+            if op == "lte":
+                return value <= target
+        except TypeError:
+            return False
+        raise PostgrestError(400, "PGRST100", f'unsupported operator "{op}"')
+
+    if op not in {"eq", "neq", "in", "is", "gt", "gte", "lt", "lte"}:
+        raise PostgrestError(400, "PGRST100", f'unsupported operator "{op}"')
+    return (lambda row: not compare(row)) if negate else compare
+
+
+def _parse_prefer(header: Optional[str]) -> Dict[str, str]:
+    prefs: Dict[str, str] = {}
+    for part in (header or "").split(","):
+        key, _, value = part.strip().partition("=")
+        if key:
+            prefs[key] = value
+    return prefs
+
+
+# -------------------------------------------------------------------- store
+
+
+class TableStore:
+    """In-memory tables guarded by one lock (requests are served from threads)."""
+
+    def __init__(self, unique_keys: Optional[Dict[str, Sequence[str]]] = None) -> None:
+        self.tables: Dict[str, List[Row]] = {}
+        self.unique_keys = {**DEFAULT_UNIQUE_KEYS, **{k: tuple(v) for k, v in (unique_keys or {}).items()}}
+        self.lock = threading.Lock()
+
+    def seed(self, table: str, rows: List[Row]) -> None:
+        with self.lock:
+            self.tables.setdefault(table, []).extend(self._with_id(dict(row)) for row in rows)
+
+    def select(
+        self,
+        table: str,
+        filters: List[Callable[[Row], bool]],
+        order: Optional[str],
+        limit: Optional[int],
+        offset: int,
+    ) -> Tuple[List[Row], int]:
+        with self.lock:
+            rows = [row for row in self.tables.get(table, []) if all(f(row) for f in filters)]
+        total = len(rows)
+        for clause in reversed((order or "").split(",") if order else []):
+            column, _, direction = clause.partition(".")
+            descending = direction.startswith("desc")
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=descending)
+        rows = rows[offset:]
+        if limit is not None:
+            rows = rows[:limit]
+        return [dict(row) for row in rows], total
+
+    def insert(self, table: str, payload: List[Row], conflict: Tuple[str, ...], resolution: Optional[str]) -> List[Row]:
+        written: List[Row] = []
+        with self.lock:
+            rows = self.tables.setdefault(table, [])
+            index = {self._key(row, conflict): row for row in rows if self._key(row, conflict)}
+            if resolution not in ("merge-duplicates", "ignore-duplicates"):
+                self._check_unique(table, payload, conflict, set(index))  # all-or-nothing like one INSERT
+            for item in payload:
+                key = self._key(item, conflict)
+                existing = index.get(key) if key else None
+                if existing is None:
+                    row = self._with_id(dict(item))
+                    rows.append(row)
+                    if key:
+                        index[key] = row
+                elif resolution == "merge-duplicates":
+                    existing.update(item)
+                    row = existing
+                elif resolution == "ignore-duplicates":
+                    continue
+                written.append(dict(row))
+        return written
+
+    def _check_unique(self, table: str, payload: List[Row], conflict: Tuple[str, ...], seen: set) -> None:
+        for item in payload:
+            key = self._key(item, conflict)
+            if key is None:
+                continue
+            if key in seen:
+                raise PostgrestError(
+                    409,
+                    "23505",
+                    f'duplicate key value violates unique constraint on {table} ({", ".join(conflict)})',
+                )
+            seen.add(key)
+
+    def update(self, table: str, filters: List[Callable[[Row], bool]], changes: Row) -> List[Row]:
+        with self.lock:
+            matched = [row for row in self.tables.get(table, []) if all(f(row) for f in filters)]
+            for row in matched:
+                row.update(changes)
+            return [dict(row) for row in matched]
+
+    def delete(self, table: str, filters: List[Callable[[Row], bool]]) -> List[Row]:
+        with self.lock:
+            rows = self.tables.get(table, [])
+            kept = [row for row in rows if not all(f(row) for f in filters)]
+            removed = [row for row in rows if all(f(row) for f in filters)]
+            self.tables[table] = kept
+            return removed
+
+    def conflict_columns(self, table: str, on_conflict: Optional[str]) -> Tuple[str, ...]:
+        if on_conflict:
+            return tuple(column.strip() for column in on_conflict.split(","))
+        return self.unique_keys.get(table, ("id",))
+
+    @staticmethod
+    def _key(row: Row, columns: Tuple[str, ...]) -> Optional[Tuple]:
+        values = tuple(row.get(column) for column in columns)
+        return None if any(value is None for value in values) else values
+
+    @staticmethod
+    def _with_id(row: Row) -> Row:
+        row.setdefault("id", str(uuid.uuid4()))
+        return row
+
+
+# ------------------------------------------------------------------- server
+
+
+class FakePostgREST:
+    """Threaded HTTP server speaking a subset of PostgREST; usable as a context manager."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        unique_keys: Optional[Dict[str, Sequence[str]]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.store = TableStore(unique_keys)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stats: Counter = Counter()
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakePostgREST":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-postgrest", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        if self._thread:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakePostgREST":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _roll_failure(self) -> bool:
+        with self._random_lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return failed
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, fmt: str, *args: Any) -> None:
+                logging.debug("fake-postgrest: " + fmt, *args)
+
+            def do_GET(self) -> None:
+                self._dispatch("GET")
+
+            def do_HEAD(self) -> None:
+                self._dispatch("HEAD")
+
+            def do_POST(self) -> None:
+                self._dispatch("POST")
+
+            def do_PATCH(self) -> None:
+                self._dispatch("PATCH")
+
+            def do_DELETE(self) -> None:
+                self._dispatch("DELETE")
+
+            def _dispatch(self, method: str) -> None:
+                parts = urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if parts.path == "/__stats":
+                    self._send(200, dict(server.stats))
+                    return
+                if not parts.path.startswith(REST_PREFIX):
+                    self._send(404, {"code": "PGRST000", "message": f"no route for {parts.path}"})
+                    return
+                table = parts.path[len(REST_PREFIX):].strip("/")
+                server.stats[f"{method} {table}"] += 1
+                if server._roll_failure():
+                    server.stats["injected_errors"] += 1
+                    self._send(server.error_status, {"code": "PGRST503", "message": "injected failure"})
+                    return
+                try:
+                    self._handle(method, table, parse_qsl(parts.query, keep_blank_values=True), body)
+                except PostgrestError as exc:
+                    self._send(exc.status, {"code": exc.code, "message": exc.message, "details": None, "hint": None})
+                except (ValueError, json.JSONDecodeError) as exc:
+                    self._send(400, {"code": "PGRST102", "message": str(exc), "details": None, "hint": None})
+
+            def _handle(self, method: str, table: str, query: List[Tuple[str, str]], body: bytes) -> None:
+                params = dict(query)
+                filters = [_make_filter(k, v) for k, v in query if k not in RESERVED_PARAMS]
+                prefer = _parse_prefer(self.headers.get("Prefer"))
+                representation = prefer.get("return") == "representation"
+                columns = params.get("select", "*")
+
+                if method in ("GET", "HEAD"):
+                    limit = int(params["limit"]) if "limit" in params else None
+                    offset = int(params.get("offset", 0))
+                    rows, total = server.store.select(table, filters, params.get("order"), limit, offset)
+                    self._send_rows(200, rows, columns, total if prefer.get("count") == "exact" else None, offset)
+                    return
+
+                if method == "POST":
+                    payload = json.loads(body or b"[]")
+                    payload = payload if isinstance(payload, list) else [payload]
+                    conflict = server.store.conflict_columns(table, params.get("on_conflict"))
+                    rows = server.store.insert(table, payload, conflict, prefer.get("resolution"))
+                    self._send_rows(201, rows if representation else None, columns)
+                    return
+
+                if not filters:
+                    # PostgREST (with the usual safeupdate setting) refuses unfiltered writes.
+                    raise PostgrestError(400, "21000", f"{method} requires a WHERE clause")
+                if method == "PATCH":
+                    rows = server.store.update(table, filters, json.loads(body or b"{}"))
+                else:
+                    rows = server.store.delete(table, filters)
+                self._send_rows(200 if representation else 204, rows if representation else None, columns)
+
+            def _send_rows(
+                self,
+                status: int,
+                rows: Optional[List[Row]],
+                columns: str,
+                total: Optional[int] = None,
+                offset: int = 0,
+            ) -> None:
+                headers: Dict[str, str] = {}
+                if rows is not None and columns.strip() != "*":
+                    wanted = [column.strip() for column in columns.split(",") if column.strip()]
+                    rows = [{column: row.get(column) for column in wanted} for row in rows]
+                if total is not None:
+                    end = offset + len(rows or []) - 1
+                    headers["Content-Range"] = f"{offset}-{end}/{total}" if rows else f"*/{total}"
+                if rows is None:
+                    self._send(status if status != 200 else 204, None, headers)
+                    return
+                if SINGLE_OBJECT_MEDIA_TYPE in (self.headers.get("Accept") or ""):
+                    if len(rows) != 1:
+                        raise PostgrestError(
+                            406, "PGRST116", f"JSON object requested, multiple (or no) rows returned ({len(rows)})"
+                        )
+                    self._send(status, rows[0], headers)
+                    return
+                self._send(status, rows, headers)
+
+            def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+                data = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                if payload is not None:
+                    self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if self.command != "HEAD" and data:
+                    self.wfile.write(data)
+
+        return Handler
+
+
+# ---------------------------------------------------------------------- CLI
+
+
+def parse_mapping(values: Sequence[str], flag: str) -> Dict[str, str]:
+    mapping: Dict[str, str] = {}
+    for value in values:
+        key, sep, rest = value.partition("=")
+        if not sep or not key or not rest:
+            raise SystemExit(f"{flag} expects TABLE=VALUE, got {value!r}")
+        mapping[key] = rest
+    return mapping
+
+
+def _raise_keyboard_interrupt(signum: int, frame: Any) -> None:
+    raise KeyboardInterrupt
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local fake PostgREST server for load-testing Supabase writers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random delay (uniform 0..N ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability that a request fails (0-1)")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected failures")
+    parser.add_argument("--random-seed", type=int, help="Seed for latency jitter and error injection")
+    parser.add_argument(
+        "--unique",
+        action="append",
+        default=[],
+        metavar="TABLE=COL[,COL]",
+        help="Upsert conflict columns of a table (default: phd_positions=source_id, otherwise id)",
+    )
+    parser.add_argument(
+        "--seed",
+        action="append",
+        default=[],
+        metavar="TABLE=FILE.json",
+        help="Load initial rows (JSON array) into a table; repeatable",
+    )
+    parser.add_argument("--dump", type=Path, help="Write all tables to this JSON file on exit")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=getattr(logging, args.log_level), format="%(asctime)s [%(levelname)s] %(message)s")
+
+    unique_keys = {table: cols.split(",") for table, cols in parse_mapping(args.unique, "--unique").items()}
+    server = FakePostgREST(
+        host=args.host,
+        port=args.port,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        unique_keys=unique_keys,
+        seed=args.random_seed,
+    )
+    for table, path in parse_mapping(args.seed, "--seed").items():
+        rows = json.loads(Path(path).read_text(encoding="utf-8"))
+        server.store.seed(table, rows)
+        logging.info("Seeded %s with %d rows from %s", table, len(rows), path)
+
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)  # so --dump also runs under `kill`
+    logging.info("Fake PostgREST listening on %s (set VITE_SUPABASE_URL to this)", server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        logging.info("Requests: %s", dict(server.stats) or "none")
+        if args.dump:
+            args.dump.write_text(json.dumps(server.store.tables, ensure_ascii=False, indent=2), encoding="utf-8")
+            logging.info("Tables written to %s", args.dump)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Pluggable parser backends for the scrapers' BeautifulSoup parsing.
+
+Every scraper builds its soup through `make_soup`, so the tree builder can be
+switched per scraper (`--parser html.parser|lxml`) without touching the
+extraction code. `html.parser` is pure Python and always available; `lxml`
+is a C parser listed in `requirements_scraper.txt`, and without it
+`check_parser` rejects `--parser lxml` with an install hint.
+`parser_fixtures.py` checks the committed fixtures against their expected
+records and that both backends extract the same records from them; the two
+build different trees for omitted end tags, so check saved pages of the site
+too before switching.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+DEFAULT_PARSER = "html.parser"
+PARSER_BACKENDS = ("html.parser", "lxml")
+
+
+def available_parsers() -> List[str]:
+    """Return the backends from PARSER_BACKENDS that are usable in this environment."""
+    usable = []
+    for backend in PARSER_BACKENDS:
+        try:
+            BeautifulSoup("", backend)
+        except FeatureNotFound:
+            continue
+        usable.append(backend)
+    return usable
+
+
+def check_parser(backend: str) -> str:
+    """Validate a backend name early (at construction time rather than on the first page)."""
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend {backend!r}; choose from {', '.join(PARSER_BACKENDS)}")
+    if backend not in available_parsers():
+        raise RuntimeError(f"Parser backend {backend!r} is not installed (pip install {backend})")
+    return backend
+
+
+def make_soup(markup: str, backend: str = DEFAULT_PARSER) -> BeautifulSoup:
+    return BeautifulSoup(markup, backend)
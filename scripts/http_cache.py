@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP cache for detail pages, keyed by URL.
+
+This is a validator cache, not a response-body cache: each entry stores a
+response's validators (ETag / Last-Modified) and the record parsed from it,
+never the HTML. Callers send the validators as a conditional request; on
+`304 Not Modified` they reuse the stored record without downloading or
+parsing the page again. Anything else (a 200, or a server without
+validators) means a full download and parse. The cache is bounded by total
+size and evicts the least recently used entries first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    record: Optional[Dict[str, Any]]
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Size-bounded LRU cache of validators and parsed records stored under `cache_dir`."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._sizes: Dict[str, int] = {}
+        for meta_path in cache_dir.glob("*.json"):
+            key = meta_path.stem
+            self._sizes[key] = self._entry_size(key)
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _entry_size(self, key: str) -> int:
+        try:
+            return self._meta_path(key).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        key = self._key(url)
+        meta_path = self._meta_path(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as exc:
+            logging.warning("Dropping unreadable cache entry for %s: %s", url, exc)
+            self._remove(key)
+            return None
+        if meta.get("url") != url:
+            return None
+        os.utime(meta_path)  # mark as recently used
+        return CacheEntry(
+            url=url,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            record=meta.get("record"),
+        )
+
+    def store(
+        self,
+        url: str,
+        response: requests.Response,
+        record: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Store a 200 response; responses without validators are not cached."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        key = self._key(url)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "record": record,
+        }
+        meta_tmp = self._meta_path(key).with_suffix(".json.tmp")
+        meta_tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        meta_tmp.replace(self._meta_path(key))
+        with self._lock:
+            self._sizes[key] = self._entry_size(key)
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        self._meta_path(key).unlink(missing_ok=True)
+        with self._lock:
+            self._sizes.pop(key, None)
+
+    def _evict(self) -> None:
+        with self._lock:
+            total = sum(self._sizes.values())
+            if total <= self.max_bytes:
+                return
+            by_age = []
+            for key in self._sizes:
+                try:
+                    by_age.append((self._meta_path(key).stat().st_mtime, key))
+                except FileNotFoundError:
+                    by_age.append((0.0, key))
+            by_age.sort()
+        for _, key in by_age:
+            if total <= self.max_bytes:
+                break
+            total -= self._sizes.get(key, 0)
+            self._remove(key)
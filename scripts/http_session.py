@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP session factory for the scraping scripts.
+
+`create_session` returns a `requests.Session` with a sized connection pool
+(keep-alive per host) that transparently retries transient failures:
+connection errors, timeouts, HTTP 429 and 5xx. Retries back off exponentially
+with full jitter and honour `Retry-After`. Every retry spends one unit of a
+per-run `ErrorBudget`; once the budget is gone the run fails fast with
+`ErrorBudgetExhausted` instead of hammering a struggling server.
+"""
+
+from __future__ import annotations
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout)
+
+
+class ErrorBudgetExhausted(RuntimeError):
+    """Raised when a run has used up its allowance of retried requests."""
+
+
+class ErrorBudget:
+    """Thread-safe counter of retries a single run may spend."""
+
+    def __init__(self, limit: Optional[int] = 100) -> None:
+        self.limit = limit
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def spend(self, reason: str) -> None:
+        with self._lock:
+            self.spent += 1
+            if self.limit is not None and self.spent > self.limit:
+                raise ErrorBudgetExhausted(
+                    f"Error budget of {self.limit} retries exhausted (last: {reason})"
+                )
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.limit is None:
+            return None
+        return max(self.limit - self.spent, 0)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the delay requested by a `Retry-After` header (seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class RetryingSession(requests.Session):
+    """`requests.Session` that retries transient failures with backoff."""
+
+    def __init__(
+        self,
+        *,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 60.0,
+        error_budget: Optional[ErrorBudget] = None,
+    ) -> None:
+        super().__init__()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.error_budget = error_budget or ErrorBudget()
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        attempt = 0
+        while True:
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except RETRY_EXCEPTIONS as exc:
+                if attempt >= self.max_retries:
+                    raise
+                reason = f"{type(exc).__name__} for {url}"
+                retry_after = None
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                reason = f"HTTP {response.status_code} for {url}"
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                response.close()
+
+            self.error_budget.spend(reason)
+            delay = self._backoff(attempt, retry_after)
+            attempt += 1
+            logging.warning(
+                "%s; retry %s/%s in %.1fs", reason, attempt, self.max_retries, delay
+            )
+            time.sleep(delay)
+
+
+def create_session(
+    *,
+    pool_size: int = 10,
+    max_retries: int = 4,
+    backoff_base: float = 0.5,
+    backoff_max: float = 60.0,
+    error_budget: Optional[ErrorBudget] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> RetryingSession:
+    """
+    Build a retrying session whose connection pool keeps up to `pool_size`
+    keep-alive connections per host, enough for that many concurrent workers.
+    """
+    session = RetryingSession(
+        max_retries=max_retries,
+        backoff_base=backoff_base,
+        backoff_max=backoff_max,
+        error_budget=error_budget,
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=max(pool_size, 1))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
@@ -14,7 +14,12 @@ This script crawls the academic staff listing page and visits each professor's d
 Usage:
   python nus_ece_professor_scraper.py --output-json nus_ece_professors.json --output-csv nus_ece_professors.csv
 
-By default the script uses three threads to parallelise detail page downloads.
+By default the script uses three threads to parallelise detail page downloads;
+each thread reuses one Chrome from a `DriverPool` (relaunched every
+`--driver-max-pages` pages) instead of starting a browser per profile.
+With `--fetch-mode http` the detail pages (static WordPress markup) are fetched
+with a pooled `requests` session instead of Chrome; Selenium is then only
+used for the listing page when plain HTTP hits the hCaptcha check.
 """
 
 from __future__ import annotations
@@ -31,17 +36,34 @@ from pathlib import Path
 from typing import Iterable, List, Optional, Set
 from urllib.parse import urljoin, urlparse
 
-from bs4 import BeautifulSoup, Tag
+import requests
+from bs4 import Tag
 from selenium import webdriver
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+
+from driver_pool import DriverPool
+from html_parsers import DEFAULT_PARSER, PARSER_BACKENDS, check_parser, make_soup
+from http_session import ErrorBudgetExhausted, create_session
+from rate_limiter import TokenBucket
+from resource_blocking import BLOCK_PROFILES, DEFAULT_BLOCK_PROFILE, configure_options, disable_blocking, enable_blocking
+from wait_strategies import PageWaiter
 
 BASE_URL = "https://cde.nus.edu.sg"
 LISTING_URL = "https://cde.nus.edu.sg/ece/about-us/people/academic-staff/"
 REQUEST_DELAY = 1.0  # seconds, be polite to the server
+FETCH_MODES = ("browser", "http")
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/119.0.0.0 Safari/537.36"
+)
+CAPTCHA_MARKERS = ("h-captcha", "Additional security check")
+# Readiness selectors: the page can be read once one of these is present.
+LISTING_READY_SELECTOR = "a[href*='/ece/staff/'], .h-captcha, iframe[src*='hcaptcha']"
+DETAIL_READY_SELECTOR = "h1.entry-title"
+# A profile without the heading is parsed as-is after this many seconds.
+DETAIL_READY_TIMEOUT = 3.0
 
 
 @dataclass
@@ -59,11 +81,43 @@ class ProfessorRecord:
 
 
 class ProfessorScraper:
-    def __init__(self, max_workers: int = 3, headless: bool = False) -> None:
+    def __init__(
+        self,
+        max_workers: int = 3,
+        headless: bool = False,
+        parser_backend: str = DEFAULT_PARSER,
+        fetch_mode: str = "browser",
+        max_rps: float = 2.0,
+        http_timeout: float = 20.0,
+        block_resources: str = DEFAULT_BLOCK_PROFILE,
+        driver_max_pages: int = 50,
+    ) -> None:
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode {fetch_mode!r}; choose from {', '.join(FETCH_MODES)}")
         self.max_workers = max_workers
         self.headless = headless
-        self.driver = self._create_driver()
-        self.wait = WebDriverWait(self.driver, 25)
+        self.parser_backend = check_parser(parser_backend)
+        self.fetch_mode = fetch_mode
+        self.http_timeout = http_timeout
+        self.block_resources = block_resources
+        self.waiter = PageWaiter(timeout=25)
+        self.session: Optional[requests.Session] = None
+        self.limiter: Optional[TokenBucket] = None
+        if fetch_mode == "http":
+            # Same UA as Chrome so cookies from a solved captcha stay valid for the session.
+            self.session = create_session(pool_size=max_workers, headers={"User-Agent": USER_AGENT})
+            self.limiter = TokenBucket(max_rps) if max_rps > 0 else None
+        # Chrome is started on first use so the parsing methods work offline.
+        self._driver: Optional[webdriver.Chrome] = None
+        # Browser-mode detail pages: one driver per worker thread, recycled every driver_max_pages pages.
+        self.driver_pool = DriverPool(self._create_worker_driver, max_pages=driver_max_pages)
+        self._listing_blocked = False  # whether CDP blocking is active on the listing driver
+
+    @property
+    def driver(self) -> webdriver.Chrome:
+        if self._driver is None:
+            self._driver = self._create_driver()
+        return self._driver
 
     def _create_driver(self) -> webdriver.Chrome:
         chrome_options = Options()
@@ -72,17 +126,16 @@ class ProfessorScraper:
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument(
-            "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/119.0.0.0 Safari/537.36"
-        )
+        chrome_options.add_argument(f"user-agent={USER_AGENT}")
         chrome_options.add_argument("--window-size=1280,720")
         try:
-            return webdriver.Chrome(options=chrome_options)
+            driver = webdriver.Chrome(options=chrome_options)
         except WebDriverException as exc:  # noqa: N818
             logging.error("无法初始化 Chrome WebDriver，请确认已安装驱动: %s", exc)
             raise
+        # The listing may need a human to solve a captcha, so only the revocable CDP layer here.
+        self._listing_blocked = enable_blocking(driver, self.block_resources)
+        return driver
 
     def _create_worker_driver(self) -> webdriver.Chrome:
         chrome_options = Options()
@@ -91,16 +144,15 @@ class ProfessorScraper:
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument(
-            "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/119.0.0.0 Safari/537.36"
-        )
+        chrome_options.add_argument(f"user-agent={USER_AGENT}")
         chrome_options.add_argument("--window-size=1280,720")
-        return webdriver.Chrome(options=chrome_options)
+        configure_options(chrome_options, self.block_resources)
+        driver = webdriver.Chrome(options=chrome_options)
+        enable_blocking(driver, self.block_resources)
+        return driver
 
     def extract_staff_links(self, html: str) -> List[str]:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html, self.parser_backend)
         links: Set[str] = set()
 
         for anchor in soup.find_all("a", href=True):
@@ -133,7 +185,7 @@ class ProfessorScraper:
         return joined or None
 
     def _parse_detail_html(self, url: str, html: str) -> Optional[ProfessorRecord]:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html, self.parser_backend)
 
         # Avatar
         avatar_url: Optional[str] = None
@@ -207,44 +259,99 @@ class ProfessorScraper:
         logging.info("Parsed %s", name or url)
         return record
 
-    def parse_detail_page(self, url: str) -> Optional[ProfessorRecord]:
-        driver = self._create_worker_driver()
+    @staticmethod
+    def _has_captcha(html: str) -> bool:
+        return any(marker in html for marker in CAPTCHA_MARKERS)
+
+    def _fetch_http(self, url: str) -> Optional[str]:
+        """GET a page through the pooled session; None on HTTP errors or a captcha page."""
+        if self.limiter:
+            self.limiter.acquire()
         try:
-            logging.debug("Loading detail page: %s", url)
-            driver.get(url)
-            WebDriverWait(driver, 25).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(1.5)
-            html = driver.page_source
-            return self._parse_detail_html(url, html)
-        except TimeoutException:
-            logging.error("加载详情页超时: %s", url)
+            resp = self.session.get(url, timeout=self.http_timeout)
+            resp.raise_for_status()
+        except requests.RequestException as exc:
+            logging.error("HTTP fetch failed %s: %s", url, exc)
             return None
-        except WebDriverException as exc:
-            logging.error("加载详情页失败 %s: %s", url, exc)
+        if self._has_captcha(resp.text):
+            logging.error("Captcha page returned for %s; rerun with --fetch-mode browser", url)
             return None
-        finally:
-            driver.quit()
+        return resp.text
+
+    def _share_browser_cookies(self) -> None:
+        """Copy the listing browser's cookies (e.g. a solved captcha) into the HTTP session."""
+        if self.session is None or self._driver is None:
+            return
+        for cookie in self._driver.get_cookies():
+            self.session.cookies.set(
+                cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/")
+            )
 
-    def scrape(self) -> List[ProfessorRecord]:
-        try:
-            logging.info("加载教授列表页：%s", LISTING_URL)
-            self.driver.get(LISTING_URL)
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(3)
+    def parse_detail_page(self, url: str) -> Optional[ProfessorRecord]:
+        if self.fetch_mode == "http":
+            logging.debug("Fetching detail page over HTTP: %s", url)
+            html = self._fetch_http(url)
+            return self._parse_detail_html(url, html) if html is not None else None
+
+        # A driver that died here is relaunched by the pool's health check on the next acquire.
+        with self.driver_pool.lease() as driver:
+            try:
+                logging.debug("Loading detail page: %s", url)
+                driver.get(url)
+                self.waiter.ready(driver, DETAIL_READY_SELECTOR, label="detail", timeout=DETAIL_READY_TIMEOUT)
+                html = driver.page_source
+            except TimeoutException:
+                logging.error("加载详情页超时: %s", url)
+                return None
+            except WebDriverException as exc:
+                logging.error("加载详情页失败 %s: %s", url, exc)
+                return None
+        return self._parse_detail_html(url, html)
+
+    def _load_listing_with_browser(self) -> Optional[str]:
+        logging.info("加载教授列表页：%s", LISTING_URL)
+        self.driver.get(LISTING_URL)
+        self.waiter.ready(self.driver, LISTING_READY_SELECTOR, label="listing")
+        listing_html = self.driver.page_source
+
+        if self._has_captcha(listing_html):
+            logging.warning("检测到 hCaptcha 安全校验，请在浏览器中完成验证后按 Enter 继续。")
+            if self._listing_blocked:
+                # Blocked requests are not retried: lift the block and reload so the widget is complete.
+                disable_blocking(self.driver)
+                self._listing_blocked = False
+                self.driver.refresh()
+                self.waiter.ready(self.driver, LISTING_READY_SELECTOR, label="listing")
+            try:
+                input("完成验证码后按 Enter 继续...")
+            except EOFError:
+                logging.error("无法等待用户输入，建议在本地非 headless 模式运行并手动完成验证码。")
+                return None
+            self.waiter.ready(self.driver, LISTING_READY_SELECTOR, label="listing")
             listing_html = self.driver.page_source
+            if self._has_captcha(listing_html):
+                logging.error("仍检测到安全校验，无法继续抓取。")
+                return None
+        return listing_html
+
+    def _load_listing(self) -> Optional[str]:
+        """In http mode try the listing without Chrome first; fall back to the browser on a captcha."""
+        if self.fetch_mode == "http":
+            logging.info("Fetching staff listing over HTTP: %s", LISTING_URL)
+            listing_html = self._fetch_http(LISTING_URL)
+            if listing_html is not None and self.extract_staff_links(listing_html):
+                return listing_html
+            logging.warning("HTTP listing unusable, opening Chrome for the listing page only.")
+            listing_html = self._load_listing_with_browser()
+            self._share_browser_cookies()
+            return listing_html
+        return self._load_listing_with_browser()
 
-            if "h-captcha" in listing_html or "Additional security check" in listing_html:
-                logging.warning("检测到 hCaptcha 安全校验，请在浏览器中完成验证后按 Enter 继续。")
-                try:
-                    input("完成验证码后按 Enter 继续...")
-                except EOFError:
-                    logging.error("无法等待用户输入，建议在本地非 headless 模式运行并手动完成验证码。")
-                    return []
-                time.sleep(2)
-                listing_html = self.driver.page_source
-                if "h-captcha" in listing_html or "Additional security check" in listing_html:
-                    logging.error("仍检测到安全校验，无法继续抓取。")
-                    return []
+    def scrape(self) -> List[ProfessorRecord]:
+        try:
+            listing_html = self._load_listing()
+            if listing_html is None:
+                return []
 
             detail_urls = self.extract_staff_links(listing_html)
             if not detail_urls:
@@ -260,12 +367,22 @@ class ProfessorScraper:
                         record = future.result()
                         if record:
                             results.append(record)
+                    except ErrorBudgetExhausted as exc:
+                        logging.error("Retry budget exhausted, stopping: %s", exc)
+                        for pending in future_map:
+                            pending.cancel()
+                        break
                     except Exception as exc:  # noqa: BLE001
                         logging.exception("Unhandled error parsing %s: %s", url, exc)
                     finally:
-                        time.sleep(REQUEST_DELAY)
+                        if self.fetch_mode == "browser":
+                            time.sleep(REQUEST_DELAY)  # http mode is paced by the token bucket
 
             logging.info("Successfully scraped %d professor profiles.", len(results))
+            if self.fetch_mode == "browser":
+                logging.info("Detail browsers: %s", self.driver_pool.stats_line())
+            if self.fetch_mode == "browser" or self._driver is not None:
+                logging.info("Page readiness: %s", self.waiter.stats.summary())
             return results
         except TimeoutException:
             logging.error("教授列表页加载超时，终止任务。")
@@ -274,8 +391,12 @@ class ProfessorScraper:
             logging.error("教授列表页加载失败：%s", exc)
             return []
         finally:
+            self.driver_pool.close()
+            if self.session is not None:
+                self.session.close()
             try:
-                self.driver.quit()
+                if self._driver is not None:
+                    self._driver.quit()
             except Exception:
                 pass
 
@@ -316,6 +437,37 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument("--output-csv", type=Path, help="Path to write CSV output.")
     parser.add_argument("--max-workers", type=int, default=3, help="Number of parallel threads (default: 3).")
     parser.add_argument("--headless", action="store_true", help="Run Chrome in headless mode (captcha may block).")
+    parser.add_argument(
+        "--parser",
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER,
+        help="HTML parser backend (default: html.parser; lxml needs the lxml package).",
+    )
+    parser.add_argument(
+        "--fetch-mode",
+        choices=FETCH_MODES,
+        default="browser",
+        help="How to load detail pages: Chrome (default) or plain HTTP without a browser.",
+    )
+    parser.add_argument(
+        "--max-rps",
+        type=float,
+        default=2.0,
+        help="Request rate limit for --fetch-mode http (default: 2 per second, 0 = unlimited).",
+    )
+    parser.add_argument(
+        "--block-resources",
+        choices=list(BLOCK_PROFILES),
+        default=DEFAULT_BLOCK_PROFILE,
+        help="Skip resources Chrome does not need for page_source: media (images/fonts/video), "
+        "lean (+ analytics), full (+ stylesheets). Default: none.",
+    )
+    parser.add_argument(
+        "--driver-max-pages",
+        type=int,
+        default=50,
+        help="Detail pages per browser before it is relaunched to free memory (default: 50, 0 = never).",
+    )
     parser.add_argument(
         "--list-url",
         type=str,
@@ -342,7 +494,15 @@ def main(argv: Optional[List[str]] = None) -> int:
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
-    scraper = ProfessorScraper(max_workers=args.max_workers, headless=args.headless)
+    scraper = ProfessorScraper(
+        max_workers=args.max_workers,
+        headless=args.headless,
+        parser_backend=args.parser,
+        fetch_mode=args.fetch_mode,
+        max_rps=args.max_rps,
+        block_resources=args.block_resources,
+        driver_max_pages=args.driver_max_pages,
+    )
     global LISTING_URL  # allow runtime override for debugging
     LISTING_URL = args.list_url
 
@@ -14,12 +14,20 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
 from urllib.parse import urljoin
 from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
+
+from driver_pool import DriverPool
+from html_parsers import DEFAULT_PARSER, PARSER_BACKENDS, check_parser, make_soup
+from resource_blocking import BLOCK_PROFILES, DEFAULT_BLOCK_PROFILE, configure_options, enable_blocking
+from wait_strategies import PageWaiter
+
+# 页面就绪条件：出现这些元素即可读取页面，替代固定 sleep
+LIST_READY_SELECTOR = "select"
+DETAIL_READY_SELECTOR = "div.profpic, div.location, h3"
+# 个别详情页没有上述元素：最多等 DETAIL_READY_TIMEOUT 秒，之后按当前内容解析
+DETAIL_READY_TIMEOUT = 3.0
 
 DEPARTMENT_CONFIG = {
     "disa": {
@@ -38,7 +46,15 @@ DEPARTMENT_CONFIG = {
 
 
 class NUSProfessorScraper:
-    def __init__(self, department_key="disa", headless=True, max_workers=3):
+    def __init__(
+        self,
+        department_key="disa",
+        headless=True,
+        max_workers=3,
+        parser_backend=DEFAULT_PARSER,
+        driver_max_pages=50,
+        block_resources=DEFAULT_BLOCK_PROFILE,
+    ):
         """初始化爬虫"""
         if department_key not in DEPARTMENT_CONFIG:
             raise ValueError(f"暂不支持的部门标识：{department_key}")
@@ -58,18 +74,21 @@ class NUSProfessorScraper:
         self.headless = headless
         self.max_workers = max_workers
         self.lock = Lock()  # 线程安全锁
+        self.parser_backend = check_parser(parser_backend)
+        self.block_resources = block_resources  # 资源屏蔽档位，只读 page_source 不需要图片、字体等
         
-        # 配置Chrome选项
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 20)
+        # 主driver在首次使用时才创建，离线解析详情页不需要Chrome
+        self._driver = None
+        # 详情页线程复用各自的driver，每个driver处理 driver_max_pages 页后重启
+        self.driver_pool = DriverPool(self._create_driver, max_pages=driver_max_pages)
+        self.waiter = PageWaiter(timeout=20)
+    
+    @property
+    def driver(self):
+        """列表页使用的主driver（延迟创建）"""
+        if self._driver is None:
+            self._driver = self._create_driver()
+        return self._driver
     
     def _create_driver(self):
         """为每个线程创建独立的driver"""
@@ -80,7 +99,10 @@ class NUSProfessorScraper:
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
         chrome_options.add_argument('user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
-        return webdriver.Chrome(options=chrome_options)
+        configure_options(chrome_options, self.block_resources)
+        driver = webdriver.Chrome(options=chrome_options)
+        enable_blocking(driver, self.block_resources)
+        return driver
     
     def get_professor_links(self):
         """从列表页获取教授详情页链接"""
@@ -88,9 +110,8 @@ class NUSProfessorScraper:
             print("正在加载教授列表页...")
             self.driver.get(self.list_url)
             
-            # 等待页面加载
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(3)
+            # 等待筛选下拉框渲染完成
+            self.waiter.ready(self.driver, LIST_READY_SELECTOR, label="listing")
             
             print(f"正在筛选系别: {self.target_department}")
 
@@ -113,11 +134,12 @@ class NUSProfessorScraper:
             # 选择目标Department
             self.driver.execute_script(select_js)
             
-            time.sleep(5)
-            
             # 提取教授链接 - 多种方式尝试
             link_selectors = ", ".join([f"a[href*='{pattern}']" for pattern in self.link_substrings])
             link_selectors = link_selectors or "a"
+            
+            # 等待筛选后的教授链接出现且列表不再变化
+            self.waiter.ready(self.driver, link_selectors, settle_ms=800, label="listing-filter")
 
             link_js = """
                 var links = [];
@@ -188,17 +210,28 @@ class NUSProfessorScraper:
             driver = self.driver
         
         try:
-            name = link_info['name']
-            url = link_info['url']
-            
             with self.lock:
-                print(f"  访问: {name}")
+                print(f"  访问: {link_info['name']}")
             
-            driver.get(url)
-            time.sleep(2)
+            driver.get(link_info['url'])
+            self.waiter.ready(driver, DETAIL_READY_SELECTOR, label="detail", timeout=DETAIL_READY_TIMEOUT)
             
             # 获取页面源代码
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            html = driver.page_source
+        except Exception as e:
+            with self.lock:
+                print(f"  ✗ 爬取 {link_info['name']} 详情时出错: {e}")
+            return None
+        
+        return self.parse_professor_detail(link_info, html)
+    
+    def parse_professor_detail(self, link_info, html):
+        """解析教授详情页HTML（不依赖浏览器，可用保存的页面离线解析）"""
+        try:
+            name = link_info['name']
+            url = link_info['url']
+            
+            soup = make_soup(html, self.parser_backend)
             
             prof = {
                 'name': name,
@@ -609,13 +642,13 @@ class NUSProfessorScraper:
             return None
     
     def scrape_single_professor_thread(self, index, link_info):
-        """单个线程爬取一位教授的信息"""
-        driver = self._create_driver()
+        """单个线程爬取一位教授的信息（从driver池借用本线程的driver）"""
         try:
             with self.lock:
                 print(f"\n[{index}/{len(self.professor_links)}] {link_info['name']}")
             
-            prof = self.scrape_professor_detail(link_info, driver)
+            with self.driver_pool.lease() as driver:
+                prof = self.scrape_professor_detail(link_info, driver)
             
             if prof:
                 with self.lock:
@@ -631,10 +664,6 @@ class NUSProfessorScraper:
                 print(f"  ✗ 线程处理出错: {e}")
             return False
         finally:
-            try:
-                driver.quit()
-            except Exception:
-                pass
             # 避免请求过快
             time.sleep(0.5)
     
@@ -659,7 +688,10 @@ class NUSProfessorScraper:
             for future in as_completed(futures):
                 future.result()  # 获取结果，如果有异常会在这里抛出
         
+        self.driver_pool.close()
         print(f"\n✓ 成功爬取 {len(self.professors)} 位教授的详细信息")
+        print(f"  {self.driver_pool.stats_line()}")
+        print(f"  页面等待: {self.waiter.stats.summary()}")
     
     def _is_part_time(self, professor):
         """检查是否为Part-Time教授"""
@@ -744,8 +776,10 @@ class NUSProfessorScraper:
     
     def close(self):
         """关闭浏览器"""
-        if self.driver:
-            self.driver.quit()
+        self.driver_pool.close()
+        if self._driver:
+            self._driver.quit()
+            self._driver = None
             print("✓ 浏览器已关闭")
 
 
@@ -769,6 +803,24 @@ def main():
         default=3,
         help="并行爬取线程数，默认 3",
     )
+    parser.add_argument(
+        "--driver-max-pages",
+        type=int,
+        default=50,
+        help="每个详情页 driver 处理多少页后重启以释放内存，默认 50（0 表示不重启）",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER,
+        help="HTML 解析后端（默认 html.parser；lxml 需安装 lxml 包）",
+    )
+    parser.add_argument(
+        "--block-resources",
+        choices=list(BLOCK_PROFILES),
+        default=DEFAULT_BLOCK_PROFILE,
+        help="屏蔽不需要的资源以加快加载（默认 none；media=图片/字体/音视频，lean=再加统计脚本，full=再加CSS）",
+    )
     args = parser.parse_args()
 
     target_name = DEPARTMENT_CONFIG[args.department]["name"]
@@ -783,6 +835,9 @@ def main():
         department_key=args.department,
         headless=not args.show_browser,
         max_workers=args.max_workers,
+        parser_backend=args.parser,
+        driver_max_pages=args.driver_max_pages,
+        block_resources=args.block_resources,
     )
     
     try:
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Saved-page fixtures for the scrapers' HTML parsing: expected records and a backend equivalence check.
+
+Every scraper has a parse step that takes `(url, html)` and needs neither a
+browser nor the network. `TARGETS` registers those steps together with a way
+to rebuild a plausible page URL from a fixture file name, so saved pages
+(`page_source` dumps, `curl` output) can be replayed through any parser
+backend from `html_parsers`.
+
+A small set of pages per target is committed under `scripts/fixtures/<target>/`
+(reduced copies of the sites' markup; the browser-driven targets are in
+`page_source` form, i.e. with every element closed). Name new files after
+the URL's last path segment (job id, `newst_...` slug, staff slug):
+
+    scripts/fixtures/academictransfer/123456-phd-position.html
+    scripts/fixtures/compass-detail/newst_12345.html
+    scripts/fixtures/nus-ece-detail/john-doe.html
+
+Next to each page, `<name>.expected.json` holds the record the parse step
+must produce (`last_scraped_at` left out). The committed ones were checked
+against the parsers as they were before the performance work, so a refactor
+that changes any extracted field fails here.
+
+Without arguments every target is checked: the reference backend's records
+must equal the expected files, and both backends must agree with each other;
+any difference fails the run (exit status 1). Run it after touching a parse
+step, and on freshly saved pages before switching a scraper to
+`--parser lxml` (pages without an expected file are only compared across
+backends). `--update-expected` rewrites the expected files from the
+reference backend after an intended change of the output:
+
+    python3 scripts/parser_fixtures.py
+    python3 scripts/parser_fixtures.py --target academictransfer --fixtures tmp/saved_pages
+    python3 scripts/parser_fixtures.py --target compass-detail --update-expected
+
+The backends do not agree on every input: html.parser nests elements whose
+end tag is omitted (`<p>a<p>b`, `<li>a<li>b`) while lxml closes them the way
+browsers do, which changes texts collected from the parent. `page_source`
+never contains such markup, but raw HTTP responses can.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from html_parsers import DEFAULT_PARSER, PARSER_BACKENDS, check_parser
+
+DEFAULT_FIXTURES_ROOT = Path(__file__).resolve().parent / "fixtures"
+FIXTURE_ID_PATTERN = re.compile(r"^(\d+)-?(.*)$")
+VOLATILE_FIELDS = ("last_scraped_at",)
+
+ParseFunc = Callable[[str, str], Any]
+
+
+@dataclass(frozen=True)
+class ParseTarget:
+    name: str
+    description: str
+    fixture_url: Callable[[Path], str]
+    factory: Callable[[str], ParseFunc]  # backend -> parse(url, html)
+
+
+def to_jsonable(result: Any) -> Any:
+    """Normalise a parse result (dataclass, set, dict, ...) for comparison and printing."""
+    if dataclasses.is_dataclass(result) and not isinstance(result, type):
+        result = dataclasses.asdict(result)
+    if isinstance(result, dict):
+        return {key: to_jsonable(value) for key, value in result.items() if key not in VOLATILE_FIELDS}
+    if isinstance(result, (set, frozenset)):
+        return sorted(to_jsonable(value) for value in result)
+    if isinstance(result, (list, tuple)):
+        return [to_jsonable(value) for value in result]
+    return result
+
+
+# ------------------------------------------------------------------ targets
+
+
+def _academictransfer_url(path: Path) -> str:
+    match = FIXTURE_ID_PATTERN.match(path.stem)
+    job_id, slug = (match.group(1), match.group(2) or "fixture") if match else ("0", path.stem)
+    return f"https://www.academictransfer.com/en/jobs/{job_id}/{slug}/"
+
+
+def _academictransfer_parser(backend: str) -> ParseFunc:
+    from academictransfer_phd_sync import JobDetailParser
+
+    return JobDetailParser(backend).parse
+
+
+def _compass_url(path: Path) -> str:
+    from compass_offer_scraper import BASE_URL
+
+    return f"{BASE_URL}/{path.stem}"
+
+
+def _compass_listing_url(path: Path) -> str:
+    from compass_offer_scraper import LISTING_URL
+
+    return LISTING_URL
+
+
+def _compass_listing_parser(backend: str) -> ParseFunc:
+    from compass_offer_scraper import CompassOfferScraper
+
+    scraper = CompassOfferScraper(parser_backend=backend)
+    return lambda url, html: scraper.extract_offer_links(html)
+
+
+def _compass_detail_parser(backend: str) -> ParseFunc:
+    from compass_offer_scraper import CompassOfferScraper
+
+    return CompassOfferScraper(parser_backend=backend)._parse_detail_html
+
+
+def _ece_url(path: Path) -> str:
+    from nus_ece_professor_scraper import BASE_URL
+
+    return f"{BASE_URL}/ece/staff/{path.stem}"
+
+
+def _ece_listing_url(path: Path) -> str:
+    from nus_ece_professor_scraper import LISTING_URL
+
+    return LISTING_URL
+
+
+def _ece_listing_parser(backend: str) -> ParseFunc:
+    from nus_ece_professor_scraper import ProfessorScraper
+
+    scraper = ProfessorScraper(parser_backend=backend)
+    return lambda url, html: scraper.extract_staff_links(html)
+
+
+def _ece_detail_parser(backend: str) -> ParseFunc:
+    from nus_ece_professor_scraper import ProfessorScraper
+
+    return ProfessorScraper(parser_backend=backend)._parse_detail_html
+
+
+def _nus_computing_url(path: Path) -> str:
+    return f"https://www.comp.nus.edu.sg/cs/people/{path.stem}/"
+
+
+def _nus_computing_parser(backend: str) -> ParseFunc:
+    from nus_professor_scraper import NUSProfessorScraper
+
+    scraper = NUSProfessorScraper(parser_backend=backend)
+
+    def parse(url: str, html: str) -> Any:
+        name = url.rstrip("/").split("/")[-1]
+        return scraper.parse_professor_detail({"name": name, "url": url}, html)
+
+    return parse
+
+
+TARGETS: Dict[str, ParseTarget] = {
+    target.name: target
+    for target in (
+        ParseTarget(
+            "academictransfer",
+            "AcademicTransfer job detail page (JobDetailParser.parse)",
+            _academictransfer_url,
+            _academictransfer_parser,
+        ),
+        ParseTarget(
+            "compass-listing",
+            "Compass offer listing page (offer links)",
+            _compass_listing_url,
+            _compass_listing_parser,
+        ),
+        ParseTarget(
+            "compass-detail",
+            "Compass offer detail page",
+            _compass_url,
+            _compass_detail_parser,
+        ),
+        ParseTarget(
+            "nus-ece-listing",
+            "NUS ECE academic staff listing (staff links)",
+            _ece_listing_url,
+            _ece_listing_parser,
+        ),
+        ParseTarget(
+            "nus-ece-detail",
+            "NUS ECE staff profile page",
+            _ece_url,
+            _ece_detail_parser,
+        ),
+        ParseTarget(
+            "nus-computing-detail",
+            "NUS Computing faculty profile page",
+            _nus_computing_url,
+            _nus_computing_parser,
+        ),
+    )
+}
+
+
+def fixture_paths(directory: Path) -> List[Path]:
+    paths = sorted(directory.glob("*.html"))
+    if not paths:
+        raise SystemExit(f"No *.html fixtures found in {directory}")
+    return paths
+
+
+def expected_path(path: Path) -> Path:
+    return path.with_name(f"{path.stem}.expected.json")
+
+
+def load_fixtures(target: ParseTarget, directory: Path) -> List[Tuple[str, str]]:
+    """Return [(url, html)] for every *.html file in `directory`, sorted by file name."""
+    return [(target.fixture_url(path), path.read_text(encoding="utf-8")) for path in fixture_paths(directory)]
+
+
+def parse_pages(target: ParseTarget, backend: str, pages: List[Tuple[str, str]]) -> List[Any]:
+    parse = target.factory(backend)
+    return [to_jsonable(parse(url, html)) for url, html in pages]
+
+
+# ---------------------------------------------------------------------- CLI
+
+
+def compare_backends(
+    target: ParseTarget,
+    pages: List[Tuple[str, str]],
+    reference: str,
+    candidate: str,
+    show_diff: bool = False,
+) -> int:
+    """Parse `pages` with both backends, print mismatches and return how many there were."""
+    expected = parse_pages(target, reference, pages)
+    actual = parse_pages(target, candidate, pages)
+    mismatches = 0
+    for (url, _), ref, cand in zip(pages, expected, actual):
+        if ref == cand:
+            continue
+        mismatches += 1
+        print(f"MISMATCH   {url}")
+        if show_diff:
+            print(f"  {reference}: {json.dumps(ref, ensure_ascii=False, sort_keys=True)}")
+            print(f"  {candidate}: {json.dumps(cand, ensure_ascii=False, sort_keys=True)}")
+    print(f"{target.name}: {len(pages) - mismatches}/{len(pages)} pages identical ({reference} vs {candidate})")
+    return mismatches
+
+
+def check_expected(
+    target: ParseTarget,
+    directory: Path,
+    backend: str,
+    show_diff: bool = False,
+    update: bool = False,
+) -> int:
+    """Compare `backend`'s records with the `.expected.json` files (or rewrite them); return mismatches."""
+    paths = fixture_paths(directory)
+    actual = parse_pages(target, backend, load_fixtures(target, directory))
+    checked = mismatches = 0
+    for path, record in zip(paths, actual):
+        expected_file = expected_path(path)
+        if update:
+            expected_file.write_text(
+                json.dumps(record, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+            )
+            continue
+        if not expected_file.exists():
+            continue
+        checked += 1
+        expected = json.loads(expected_file.read_text(encoding="utf-8"))
+        if record == expected:
+            continue
+        mismatches += 1
+        print(f"UNEXPECTED {path}")
+        if show_diff:
+            print(f"  expected: {json.dumps(expected, ensure_ascii=False, sort_keys=True)}")
+            print(f"  {backend}: {json.dumps(record, ensure_ascii=False, sort_keys=True)}")
+    if update:
+        print(f"{target.name}: wrote {len(paths)} expected records from {backend}")
+    elif checked:
+        print(f"{target.name}: {checked - mismatches}/{checked} pages match the expected records ({backend})")
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check parse steps against expected records and compare parser backends on saved HTML pages"
+    )
+    parser.add_argument("--target", choices=sorted(TARGETS), help="Parse step to check (default: all targets)")
+    parser.add_argument(
+        "--fixtures",
+        type=Path,
+        help="Directory with saved pages (*.html) for --target (default: <fixtures-root>/<target>)",
+    )
+    parser.add_argument(
+        "--fixtures-root",
+        type=Path,
+        default=DEFAULT_FIXTURES_ROOT,
+        help="Directory with one sub-directory per target (default: the committed scripts/fixtures)",
+    )
+    parser.add_argument("--reference", choices=PARSER_BACKENDS, default=DEFAULT_PARSER, help="Reference backend")
+    parser.add_argument("--candidate", choices=PARSER_BACKENDS, default="lxml", help="Backend to check")
+    parser.add_argument("--show-diff", action="store_true", help="Print both results for every mismatch")
+    parser.add_argument(
+        "--update-expected",
+        action="store_true",
+        help="Rewrite <page>.expected.json from the reference backend instead of checking",
+    )
+    args = parser.parse_args(argv)
+    if args.fixtures and not args.target:
+        parser.error("--fixtures needs --target")
+
+    try:
+        check_parser(args.reference)
+        if not args.update_expected:
+            check_parser(args.candidate)
+    except RuntimeError as exc:
+        print(f"{exc}; it is listed in scripts/requirements_scraper.txt", file=sys.stderr)
+        return 2
+    names = [args.target] if args.target else sorted(TARGETS)
+    mismatches = 0
+    for name in names:
+        directory = args.fixtures or args.fixtures_root / name
+        if not args.target and not directory.is_dir():
+            print(f"{name}: no fixtures in {directory}, skipped")
+            continue
+        target = TARGETS[name]
+        mismatches += check_expected(target, directory, args.reference, args.show_diff, args.update_expected)
+        if args.update_expected:
+            continue
+        pages = load_fixtures(target, directory)
+        mismatches += compare_backends(target, pages, args.reference, args.candidate, args.show_diff)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Thread-safe token-bucket rate limiter shared by the scraping scripts.
+
+A single bucket is shared by every worker thread of a run, so the overall
+request rate stays within the politeness budget no matter how many requests
+are in flight at the same time.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Allow at most `rate` acquisitions per second with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(burst) if burst and burst > 0 else 1.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_delay(cls, delay: float) -> Optional["TokenBucket"]:
+        """Build a bucket equivalent to sleeping `delay` seconds between calls."""
+        if not delay or delay <= 0:
+            return None
+        return cls(rate=1.0 / delay)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available. Returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                shortfall = (tokens - self._tokens) / self.rate
+            time.sleep(shortfall)
+            waited += shortfall
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Small helpers for reading and writing scraped records as JSON or NDJSON.
+
+NDJSON (one JSON object per line) lets producers flush every record as soon as
+it exists and lets consumers iterate records lazily without loading the whole
+dataset. A run that crashes mid-write leaves at most one truncated line, which
+the reader skips and the writer trims before appending again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+
+try:  # optional: incremental parsing of large JSON files
+    import ijson
+except ImportError:  # pragma: no cover - depends on the environment
+    ijson = None
+
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+
+
+def is_ndjson_path(path: Path) -> bool:
+    return path.suffix.lower() in NDJSON_SUFFIXES
+
+
+def iter_ndjson(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield records from an NDJSON file one at a time."""
+    with path.open("r", encoding="utf-8") as fp:
+        for line_no, line in enumerate(fp, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logging.warning("Skipping malformed NDJSON line %s in %s", line_no, path)
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a scrape output file.
+
+    NDJSON files are read lazily; regular JSON files may either be a list of
+    records or an object with an `items` list (the format written by the
+    AcademicTransfer scripts). JSON files are parsed incrementally when
+    `ijson` is installed and loaded whole otherwise.
+    """
+    if is_ndjson_path(path):
+        yield from iter_ndjson(path)
+        return
+    if ijson is not None:
+        yield from _iter_json_items_lazily(path)
+        return
+    data = json.loads(path.read_text(encoding="utf-8"))
+    items = data.get("items", []) if isinstance(data, dict) else data
+    yield from items
+
+
+def read_json_metadata(path: Path) -> Dict[str, Any]:
+    """
+    Return the top-level keys other than `items` of a JSON scrape output.
+
+    NDJSON files and bare JSON lists carry no metadata. With `ijson` the
+    file is scanned without materialising the `items` array.
+    """
+    if is_ndjson_path(path):
+        return {}
+    if ijson is None:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(data, dict):
+            return {}
+        return {key: value for key, value in data.items() if key != "items"}
+    metadata: Dict[str, Any] = {}
+    key: Optional[str] = None
+    builder = None
+    with path.open("rb") as fp:
+        for prefix, event, value in ijson.parse(fp, use_float=True):
+            if prefix == "" and event == "map_key":
+                key = value
+                builder = None if key == "items" else ijson.ObjectBuilder()
+                continue
+            if builder is None:
+                continue
+            builder.event(event, value)
+            if prefix == key and event not in ("start_map", "start_array", "map_key"):
+                metadata[key] = builder.value
+                builder = None
+    return metadata
+
+
+def _iter_json_items_lazily(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("rb") as fp:
+        head = fp.read(4096).lstrip()
+        fp.seek(0)
+        prefix = "item" if head.startswith(b"[") else "items.item"
+        yield from ijson.items(fp, prefix, use_float=True)
+
+
+def write_json_atomic(path: Path, data: Any, indent: Optional[int] = 2) -> None:
+    """Write JSON to a temp file next to `path` and rename it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as fp:
+        json.dump(data, fp, ensure_ascii=False, indent=indent)
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(tmp_path, path)
+
+
+def collect_written_keys(
+    path: Path, key: Callable[[Dict[str, Any]], Optional[Any]]
+) -> Set[str]:
+    """Return `key(record)` for every record already written to an NDJSON file."""
+    if not path.exists():
+        return set()
+    keys: Set[str] = set()
+    for record in iter_ndjson(path):
+        value = key(record)
+        if value is not None:
+            keys.add(str(value))
+    return keys
+
+
+class NdjsonWriter:
+    """Append records to an NDJSON file, flushing after every record."""
+
+    def __init__(self, path: Path, truncate: bool = False) -> None:
+        self.path = path
+        self.count = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if truncate or not path.exists():
+            path.write_text("", encoding="utf-8")
+        else:
+            self._trim_partial_line()
+        self._fp = path.open("a", encoding="utf-8")
+
+    def _trim_partial_line(self) -> None:
+        """Drop a trailing line without newline left behind by an interrupted run."""
+        with self.path.open("rb+") as fp:
+            end = fp.seek(0, 2)
+            if end == 0:
+                return
+            fp.seek(end - 1)
+            if fp.read(1) == b"\n":
+                return
+            pos = end
+            cut = 0
+            while pos > 0:
+                start = max(0, pos - 65536)
+                fp.seek(start)
+                newline = fp.read(pos - start).rfind(b"\n")
+                if newline != -1:
+                    cut = start + newline + 1
+                    break
+                pos = start
+            fp.truncate(cut)
+            logging.warning("Trimmed incomplete trailing record from %s", self.path)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._fp.write(json.dumps(record, ensure_ascii=False))
+        self._fp.write("\n")
+        self._fp.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        if not self._fp.closed:
+            self._fp.close()
+
+    def __enter__(self) -> "NdjsonWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class JsonItemsWriter:
+    """
+    Stream records into a `{..., "items": [...], "total": N}` JSON file.
+
+    `metadata` (e.g. `generated_at`, `failed`) is written ahead of the items;
+    `total` always reflects the records written. Records are written to a
+    temp file as they arrive; `close()` finishes the document and renames it
+    into place, so readers never see a partial file.
+    """
+
+    def __init__(self, path: Path, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.path = path
+        self.count = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        self._fp = self._tmp_path.open("w", encoding="utf-8")
+        self._fp.write("{")
+        for key, value in (metadata or {}).items():
+            if key in ("items", "total"):
+                continue
+            self._fp.write(f"\n  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},")
+        self._fp.write('\n  "items": [')
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._fp.write("\n    " if self.count == 0 else ",\n    ")
+        self._fp.write(json.dumps(record, ensure_ascii=False))
+        self.count += 1
+
+    def close(self) -> None:
+        if self._fp.closed:
+            return
+        self._fp.write(f'\n  ],\n  "total": {self.count}\n}}\n')
+        self._fp.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Drop the temp file without touching an existing output."""
+        if not self._fp.closed:
+            self._fp.close()
+        try:
+            self._tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "JsonItemsWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
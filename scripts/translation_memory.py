@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Persistent translation memory plus a batching client for the public Google
+Translate endpoint.
+
+Texts are split into paragraphs and every paragraph is looked up in a SQLite
+table keyed by (sha256 of the paragraph, target language), so boilerplate that
+repeats across thousands of postings ("Conditions of employment", university
+blurbs) is translated once and reused across runs. Paragraphs that miss are
+packed into newline-joined requests of up to `max_chars` characters; if the
+endpoint does not return one line per input paragraph the batch falls back to
+one request per paragraph. Batches can be sent from a small thread pool
+that shares one `TokenBucket`; results are keyed by paragraph, so the output
+does not depend on which request finishes first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+from rate_limiter import TokenBucket
+
+TRANSLATE_ENDPOINT = "https://translate.googleapis.com/translate_a/single"
+DEFAULT_DB_PATH = Path("tmp/translation_memory.sqlite3")
+DEFAULT_MAX_CHARS = 4000
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;])\s+")
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def split_long_paragraph(paragraph: str, max_chars: int) -> List[str]:
+    """Split a paragraph longer than `max_chars` on sentence boundaries."""
+    if len(paragraph) <= max_chars:
+        return [paragraph]
+    pieces: List[str] = []
+    current = ""
+    for sentence in SENTENCE_BOUNDARY.split(paragraph):
+        while len(sentence) > max_chars:  # no usable boundary: hard split
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+class TranslationMemory:
+    """SQLite-backed store of translated segments, safe to share between threads."""
+
+    def __init__(self, path: Optional[Path] = DEFAULT_DB_PATH) -> None:
+        self.path = path
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path) if path else ":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " key TEXT NOT NULL,"
+                " lang TEXT NOT NULL,"
+                " source TEXT NOT NULL,"
+                " translation TEXT NOT NULL,"
+                " PRIMARY KEY (key, lang))"
+            )
+            self._conn.commit()
+
+    def get_many(self, segments: Iterable[str], lang: str) -> Dict[str, str]:
+        """Return {segment: translation} for the segments already stored."""
+        by_key = {text_key(segment): segment for segment in segments}
+        found: Dict[str, str] = {}
+        keys = list(by_key)
+        with self._lock:
+            for start in range(0, len(keys), 500):  # stay under SQLite's variable limit
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, translation FROM translations WHERE lang = ? AND key IN ({placeholders})",
+                    [lang, *batch],
+                ).fetchall()
+                for key, translation in rows:
+                    found[by_key[key]] = translation
+        return found
+
+    def put_many(self, translations: Dict[str, str], lang: str) -> None:
+        if not translations:
+            return
+        rows = [(text_key(src), lang, src, dst) for src, dst in translations.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, lang, source, translation) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class Translator:
+    """
+    Paragraph-level translator backed by a `TranslationMemory`.
+
+    `translate_many` translates several texts at once so that cache misses from
+    all of them share the same batched requests; with `workers > 1` those
+    batches are sent concurrently, throttled by the shared `limiter`. A text
+    whose paragraphs could not all be translated comes back as None; successful
+    paragraphs are still stored, so a later run only pays for the failures.
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        memory: Optional[TranslationMemory] = None,
+        target_lang: str = "zh-CN",
+        max_chars: int = DEFAULT_MAX_CHARS,
+        timeout: int = 30,
+        workers: int = 1,
+        limiter: Optional[TokenBucket] = None,
+    ) -> None:
+        self.session = session or requests.Session()
+        self.memory = memory or TranslationMemory(None)
+        self.target_lang = target_lang
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.workers = max(workers, 1)
+        self.limiter = limiter
+        self._pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        self._stats_lock = threading.Lock()
+
+    # ------------------------------------------------------------------ public
+
+    def translate(self, text: str) -> Optional[str]:
+        return self.translate_many([text])[0]
+
+    def translate_many(self, texts: Sequence[str]) -> List[Optional[str]]:
+        layouts = [self._layout(text) for text in texts]
+        segments = {seg for layout in layouts for line in layout for seg in line}
+
+        known = self.memory.get_many(segments, self.target_lang) if segments else {}
+        missing = [seg for seg in segments if seg not in known]
+        with self._stats_lock:
+            self.hits += len(segments) - len(missing)
+            self.misses += len(missing)
+
+        fresh = self._translate_segments(sorted(missing))
+        self.memory.put_many(fresh, self.target_lang)
+        known.update(fresh)
+
+        results: List[Optional[str]] = []
+        for text, layout in zip(texts, layouts):
+            if not text:
+                results.append("")
+                continue
+            if any(seg not in known for line in layout for seg in line):
+                results.append(None)
+                continue
+            lines = [" ".join(known[seg] for seg in line) for line in layout]
+            results.append("\n".join(lines).strip())
+        return results
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats_line(self) -> str:
+        return (
+            f"translation memory: {self.hits} hits / {self.misses} misses "
+            f"({self.hit_rate:.1%} hit rate), {self.requests} requests"
+        )
+
+    # ---------------------------------------------------------------- internal
+
+    def _layout(self, text: str) -> List[List[str]]:
+        """Split a text into lines, each a list of segments to translate (blank lines kept)."""
+        if not text:
+            return []
+        layout: List[List[str]] = []
+        for line in text.split("\n"):
+            line = line.strip()
+            layout.append(split_long_paragraph(line, self.max_chars) if line else [])
+        return layout
+
+    def _batches(self, segments: List[str]) -> Iterable[List[str]]:
+        batch: List[str] = []
+        size = 0
+        for segment in segments:
+            if batch and size + 1 + len(segment) > self.max_chars:
+                yield batch
+                batch, size = [], 0
+            batch.append(segment)
+            size += len(segment) + (1 if size else 0)
+        if batch:
+            yield batch
+
+    def _translate_segments(self, segments: List[str]) -> Dict[str, str]:
+        batches = list(self._batches(segments))
+        if self._pool and len(batches) > 1:
+            results = self._pool.map(self._translate_batch, batches)
+        else:
+            results = map(self._translate_batch, batches)
+        translated: Dict[str, str] = {}
+        for result in results:
+            translated.update(result)
+        return translated
+
+    def _translate_batch(self, batch: List[str]) -> Dict[str, str]:
+        translated: Dict[str, str] = {}
+        result = self._request("\n".join(batch))
+        lines = result.split("\n") if result is not None else []
+        if len(batch) > 1 and len(lines) != len(batch):
+            # Line structure not preserved: retry paragraph by paragraph.
+            for segment in batch:
+                single = self._request(segment)
+                if single:
+                    translated[segment] = single.strip()
+            return translated
+        for segment, line in zip(batch, lines):
+            if line.strip():
+                translated[segment] = line.strip()
+        return translated
+
+    def close(self) -> None:
+        if self._pool:
+            self._pool.shutdown()
+        self.memory.close()
+
+    def _request(self, text: str) -> Optional[str]:
+        if self.limiter:
+            self.limiter.acquire()
+        with self._stats_lock:
+            self.requests += 1
+        payload = {
+            "client": "gtx",
+            "sl": "auto",
+            "tl": self.target_lang,
+            "dt": "t",
+            "q": text,
+        }
+        try:
+            resp = self.session.get(TRANSLATE_ENDPOINT, params=payload, timeout=self.timeout)
+            resp.raise_for_status()
+            data = resp.json()
+            return "".join(segment[0] for segment in data[0] if segment and segment[0])
+        except (requests.RequestException, ValueError, IndexError, TypeError) as exc:
+            # ErrorBudgetExhausted from a shared RetryingSession propagates: the run must stop.
+            logging.warning("Translation failed (text starts with %r): %s", text[:40], exc)
+            return None
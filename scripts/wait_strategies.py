@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Condition-based readiness waits for the Selenium scrapers.
+
+The scrapers used to sleep a fixed 0.5-5 s after every navigation, paying the
+full delay on fast pages and still racing slow ones. `PageWaiter` instead
+polls the page until a condition holds (or `timeout` passes):
+
+- `for_selector`: a CSS selector the scraper needs is present (each scraper
+  declares its `*_READY_SELECTOR`);
+- `for_network_idle`: `document.readyState` is complete and no new entries
+  have appeared in the Resource Timing buffer for `idle_ms`. Plain Selenium
+  cannot subscribe to CDP network events, so this polls the same data from
+  the page instead;
+- `for_dom_settle`: a MutationObserver has seen no nodes added, removed or
+  changed for `settle_ms` (client-side rendering and lazy loading have
+  finished). Attribute changes are ignored, so CSS animations and carousels
+  do not keep a page "unsettled";
+- `for_condition`: any predicate, for page-specific checks.
+
+Every wait accepts a `timeout` overriding the waiter's default. `ready`
+chains a selector wait with a settle wait capped at `settle_timeout`: once
+the selector is there the page is usable, settling is only a refinement and
+must not cost the full timeout on pages that never stop changing. Pages
+that may legitimately lack the selector (profile pages without a photo,
+...) should pass a short `timeout` too. Every wait adds its duration to a
+shared `WaitStats`, so a run can report how long it spent waiting in total
+and per label.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional
+
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+
+DEFAULT_TIMEOUT = 20.0
+DEFAULT_POLL = 0.1
+DEFAULT_SETTLE_MS = 400
+DEFAULT_IDLE_MS = 500
+DEFAULT_SETTLE_TIMEOUT = 3.0
+
+# Installs the observer on first call (per document) and returns ms since the last mutation.
+_MUTATION_PROBE = """
+if (window.__waitLastMutation === undefined) {
+    window.__waitLastMutation = performance.now();
+    new MutationObserver(function () { window.__waitLastMutation = performance.now(); })
+        .observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+}
+return performance.now() - window.__waitLastMutation;
+"""
+
+_NETWORK_PROBE = """
+return [document.readyState, performance.getEntriesByType('resource').length, performance.now()];
+"""
+
+
+class WaitStats:
+    """Thread-safe totals of time spent in readiness waits, per label."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.timeouts = 0
+
+    def add(self, label: str, seconds: float, timed_out: bool) -> None:
+        with self._lock:
+            self.seconds[label] += seconds
+            self.counts[label] += 1
+            self.timeouts += timed_out
+
+    @property
+    def total(self) -> float:
+        return sum(self.seconds.values())
+
+    def summary(self) -> str:
+        with self._lock:
+            parts = [
+                f"{label} {self.seconds[label]:.1f}s/{self.counts[label]}"
+                for label in sorted(self.seconds, key=self.seconds.get, reverse=True)
+            ]
+        detail = f" ({', '.join(parts)})" if parts else ""
+        return f"waited {self.total:.1f}s in total{detail}, {self.timeouts} timeouts"
+
+
+class PageWaiter:
+    """Polls a driver for readiness conditions and records the time spent in `stats`."""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        poll: float = DEFAULT_POLL,
+        stats: Optional[WaitStats] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.poll = poll
+        self.stats = stats or WaitStats()
+
+    # ------------------------------------------------------------------ public
+
+    def for_condition(
+        self, condition: Callable[[], bool], label: str = "condition", timeout: Optional[float] = None
+    ) -> bool:
+        """Wait for an arbitrary predicate, e.g. "the listing shows different links than before"."""
+        return self._until(label, condition, timeout)
+
+    def for_selector(
+        self, driver: WebDriver, selector: str, label: str = "selector", timeout: Optional[float] = None
+    ) -> bool:
+        return self._until(label, lambda: bool(driver.find_elements(By.CSS_SELECTOR, selector)), timeout)
+
+    def for_dom_settle(
+        self,
+        driver: WebDriver,
+        settle_ms: int = DEFAULT_SETTLE_MS,
+        label: str = "dom-settle",
+        timeout: Optional[float] = None,
+    ) -> bool:
+        return self._until(label, lambda: (driver.execute_script(_MUTATION_PROBE) or 0) >= settle_ms, timeout)
+
+    def for_network_idle(
+        self,
+        driver: WebDriver,
+        idle_ms: int = DEFAULT_IDLE_MS,
+        label: str = "network-idle",
+        timeout: Optional[float] = None,
+    ) -> bool:
+        state = {"count": -1, "since": 0.0}
+
+        def idle() -> bool:
+            ready_state, count, now = driver.execute_script(_NETWORK_PROBE)
+            if ready_state != "complete" or count != state["count"]:
+                state["count"], state["since"] = count, now
+                return False
+            return now - state["since"] >= idle_ms
+
+        return self._until(label, idle, timeout)
+
+    def ready(
+        self,
+        driver: WebDriver,
+        selector: Optional[str] = None,
+        settle_ms: int = DEFAULT_SETTLE_MS,
+        label: str = "page",
+        settle_timeout: float = DEFAULT_SETTLE_TIMEOUT,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Wait for `selector` (if given, at most `timeout`), then briefly for the DOM to settle."""
+        found = self.for_selector(driver, selector, label, timeout) if selector else True
+        settled = self.for_dom_settle(driver, settle_ms, label, settle_timeout)
+        return found and settled
+
+    # ---------------------------------------------------------------- internal
+
+    def _until(self, label: str, condition: Callable[[], bool], timeout: Optional[float] = None) -> bool:
+        start = time.monotonic()
+        deadline = start + (self.timeout if timeout is None else timeout)
+        met = False
+        while True:
+            try:
+                met = bool(condition())
+            except (InvalidSessionIdException, NoSuchWindowException):
+                raise  # the browser is gone; waiting longer cannot help
+            except WebDriverException as exc:  # page navigating away, stale document, ...
+                logging.debug("wait condition %s raised: %s", label, exc)
+            if met or time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll)
+        elapsed = time.monotonic() - start
+        self.stats.add(label, elapsed, not met)
+        if not met:
+            logging.debug("wait %s timed out after %.1fs", label, elapsed)
+        return met